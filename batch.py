@@ -0,0 +1,241 @@
+"""A NumPy engine that plays thousands of independent shoes in lockstep.
+
+Each lane of a BatchSimulator is one shoe with a single player betting one
+unit a round and an unlimited bank, so doubling and splitting are always
+allowed. Every round the opening deal, the basic strategy lookups, the
+player's hits and doubles, the dealer's draw to 17 and the settlement are
+done for all lanes at once with NumPy arrays. Hands that split are rare and
+are played one lane at a time with simulator.play_split.
+"""
+import numpy as np
+
+from blackjack import Blackjack
+from card import Card, CARDS
+from chart import Action, DecisionTable
+from simulator import play_split
+
+#The hard and soft totals the player's hand can be looked up at.
+HARD_TOTALS = range(4, 21)
+SOFT_TOTALS = range(12, 21)
+#One Card for each point value, used when a split is played with Hands.
+VALUE_CARDS = [None, None] + [
+        Card.get(rank, 'S')
+        for rank in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A']
+]
+
+
+def _start_hand(
+        value1: np.ndarray, value2: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the totals and soft flags of two-card hands."""
+    total = value1 + value2
+    soft = ((value1 == 11) | (value2 == 11)) & (total != 21)
+    total[total == 22] = 12
+    return total, soft
+
+
+def _add_card(
+        total: np.ndarray, soft: np.ndarray, value: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the totals and soft flags after adding a card to each hand.
+
+    These are the same rules as Hand.add_card.
+    """
+    high = (value == 11) & (total+11 <= 21)
+    total = total + np.where(value == 11, np.where(high, 11, 1), value)
+    soft = soft | high
+    over = (total > 21) & soft
+    return total - 10*over, soft & ~over
+
+
+class BatchSimulator:
+    """This class plays rounds for many independent shoes at once."""
+
+    def __init__(
+            self, lanes: int = 1000, numberOfDecks: int = 6,
+            seed: int | None = None,
+            table: DecisionTable = Blackjack.TABLE
+    ) -> None:
+        """Create and shuffle a shoe for each lane.
+
+        Keyword arguments:
+        lanes           --  The number of independent shoes. (1000 default)
+        numberOfDecks   --  The number of Decks in each shoe. (6 default)
+        seed            --  The seed for the NumPy Generator used to shuffle
+                            every shoe. (None default)
+        table           --  The DecisionTable to play by. A ValueError is
+                            raised if it is missing a move for a hand that
+                            can be played. (Blackjack.TABLE default)
+        """
+        for section, name, totals in (
+                (DecisionTable.HARD, 'hard', HARD_TOTALS),
+                (DecisionTable.SOFT, 'soft', SOFT_TOTALS)
+        ):
+            for total in totals:
+                for upCardIndex in range(10):
+                    index = section + total*10 + upCardIndex
+                    if table.actions[index] is None:
+                        upCard = 'A' if upCardIndex == 9 else upCardIndex + 2
+                        raise ValueError(
+                                f'The chart has no move for {name} {total} '
+                                f'against {upCard}.'
+                        )
+        self.lanes = lanes
+        self.numberOfDecks = numberOfDecks
+        self.rng = np.random.default_rng(seed)
+        self.table = table
+        #The remaining missing entries are never looked up.
+        self.actions = np.array(
+                [Action.STAND if a is None else a for a in table.actions],
+                dtype=np.int64
+        )
+        #Each shoe holds the point values of its cards, dealt from the front.
+        self.newShoe = np.array(
+                [card.value for card in CARDS] * numberOfDecks, dtype=np.int8
+        )
+        self.shoes = np.empty((lanes, len(self.newShoe)), dtype=np.int8)
+        self.position = np.zeros(lanes, dtype=np.int64)
+        self.cutCard = np.zeros(lanes, dtype=np.int64)
+        self.shuffle(np.arange(lanes))
+
+    def shuffle(self, lanes: np.ndarray) -> None:
+        """Shuffle the shoes of the given lanes and place new cut cards.
+
+        Keyword arguments:
+        lanes   --  An array of the lane numbers to shuffle.
+        """
+        self.shoes[lanes] = self.rng.permuted(
+                np.tile(self.newShoe, (len(lanes), 1)), axis=1
+        )
+        self.position[lanes] = 0
+        #The same cut card range as Shoe.place_cut_card.
+        size = len(self.newShoe)
+        low, high = (size//2, size*3//4) if size < 156 else (52, 104)
+        self.cutCard[lanes] = self.rng.integers(low, high+1, size=len(lanes))
+
+    def _draw(self, lanes: np.ndarray) -> np.ndarray:
+        """Deal the next card in each of the given lanes and return the values.
+        """
+        values = self.shoes[lanes, self.position[lanes]].astype(np.int64)
+        self.position[lanes] += 1
+        return values
+
+    def run(self, rounds: int = 100) -> np.ndarray:
+        """Play a number of rounds in every lane.
+
+        Returns an array of shape (rounds, lanes) holding the number of units
+        won or lost by the player in each round of each lane.
+
+        Keyword arguments:
+        rounds  --  The number of rounds to play through. (100 default)
+        """
+        outcomes = np.zeros((rounds, self.lanes))
+        allLanes = np.arange(self.lanes)
+        for r in range(rounds):
+            card1 = self._draw(allLanes)
+            upCard = self._draw(allLanes)
+            card2 = self._draw(allLanes)
+            hole = self._draw(allLanes)
+            total, soft = _start_hand(card1, card2)
+            bj = total == 21
+            dTotal, dSoft = _start_hand(upCard, hole)
+            dBJ = dTotal == 21
+            upCardIndex = upCard - 2
+            double = np.ones(self.lanes, dtype=np.int64)
+            pairIndex = DecisionTable.PAIR + card1*10 + upCardIndex
+            splitting = (
+                    (card1 == card2) & ~dBJ &
+                    (self.actions[pairIndex] == Action.SPLIT)
+            )
+            splits = []
+            for lane in np.flatnonzero(splitting):
+                splits.append((lane, self._play_split(
+                        lane, card1[lane], upCardIndex[lane]
+                )))
+            #Play every other hand that is still below 21.
+            lanes = np.flatnonzero(~dBJ & ~splitting & (total < 21))
+            first = True
+            while lanes.size:
+                index = (
+                        total[lanes]*10 + upCardIndex[lanes] +
+                        DecisionTable.SOFT*soft[lanes]
+                )
+                action = self.actions[index]
+                doubling = action >= Action.DOUBLE_STAND
+                if first:
+                    double[lanes[doubling]] = 2
+                    action[doubling] = Action.HIT
+                else:
+                    action[doubling] -= 2
+                lanes = lanes[action == Action.HIT]
+                total[lanes], soft[lanes] = _add_card(
+                        total[lanes], soft[lanes], self._draw(lanes)
+                )
+                lanes = lanes[(total[lanes] < 21) & (double[lanes] == 1)]
+                first = False
+            #Dealer hits on soft 17 and stands on hard 17 and all better hands.
+            lanes = allLanes
+            while True:
+                lanes = lanes[
+                        (dTotal[lanes] < 17) |
+                        ((dTotal[lanes] == 17) & dSoft[lanes])
+                ]
+                if not lanes.size:
+                    break
+                dTotal[lanes], dSoft[lanes] = _add_card(
+                        dTotal[lanes], dSoft[lanes], self._draw(lanes)
+                )
+            net = np.where(
+                    total > 21, -double,
+                    np.where(
+                            (dTotal > 21) | (dTotal < total), double,
+                            np.where(dTotal > total, -double, 0)
+                    )
+            ).astype(float)
+            net[bj] = np.where(dBJ[bj], 0.0, 1.5)
+            for lane, hands in splits:
+                net[lane] = self._settle(hands, dTotal[lane])
+            outcomes[r] = net
+            reshuffle = np.flatnonzero(
+                    len(self.newShoe) - self.position < self.cutCard
+            )
+            if reshuffle.size:
+                self.shuffle(reshuffle)
+        return outcomes
+
+    def _play_split(
+            self, lane: int, value: int, upCardIndex: int
+    ) -> list[tuple[int, bool, int]]:
+        """Play a pair that is going to be split in one lane."""
+        def deal():
+            card = VALUE_CARDS[self.shoes[lane, self.position[lane]]]
+            self.position[lane] += 1
+            return card
+        card = VALUE_CARDS[value]
+        return play_split(card, card, upCardIndex, True, deal, self.table)
+
+    @staticmethod
+    def _settle(hands: list[tuple[int, bool, int]], dTotal: int) -> float:
+        """Return the units won or lost by a set of split hands.
+
+        The dealer never has blackjack here because pairs are not played
+        against a dealer blackjack.
+        """
+        net = 0.0
+        for total, bj, double in hands:
+            if bj:
+                net += 1.5
+            elif total > 21:
+                net -= double
+            elif dTotal > 21 or dTotal < total:
+                net += double
+            elif dTotal > total:
+                net -= double
+        return net
+
+
+if __name__ == '__main__':
+    mySim = BatchSimulator(lanes=1000, seed=1)
+    outcomes = mySim.run(1000)
+    print(f'Played {outcomes.size} rounds in {mySim.lanes} shoes')
+    print(f'Mean result per round: {outcomes.mean():+.4f} units')
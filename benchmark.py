@@ -0,0 +1,265 @@
+"""Benchmarks for the hot paths of the simulator.
+
+Every benchmark is seeded, so two runs of the same version do the same
+work. Results are printed and saved as JSON, in the temp directory unless
+--output is given, and a previous JSON file can be given with --compare to
+see how the speed has changed between versions. A change to the rules
+changes the seeded games too: since split aces get one card each, the
+same seed plays slightly different rounds than before, so a comparison
+with results from before that change is not of exactly the same work.
+
+Usage:
+    python benchmark.py [--rounds N] [--seed S] [--output FILE]
+                        [--compare FILE] [--quick]
+
+Throughput is reported in operations per second, where an operation is a
+card, call or hand depending on the benchmark. Allocations are reported as
+the number of memory blocks still allocated per operation after a run
+(sys.getallocatedblocks), which shows leaks and growing caches, and the
+peak traced memory of a run (tracemalloc).
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from blackjack import Blackjack
+from card import CARDS
+from hand import Hand
+from shoe import Shoe
+from strategy import Strategy
+
+
+def measure(run, repeat: int = 3) -> dict:
+    """Time a benchmark and measure its memory use.
+
+    run is called with no arguments and must return the number of
+    operations it performed. It is timed repeat times and the fastest run is
+    kept, then run once more under tracemalloc.
+    """
+    best = None
+    for i in range(repeat):
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        operations = run()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        retained = sys.getallocatedblocks() - blocks
+        if best is None or elapsed < best[1]:
+            best = (operations, elapsed, retained)
+    operations, elapsed, retained = best
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+            'operations': operations,
+            'seconds': elapsed,
+            'perSecond': operations / elapsed,
+            'blocksPerOperation': retained / operations,
+            'peakBytes': peak
+    }
+
+
+def bench_shoe(decks: int, seed: int, shoes: int) -> dict:
+    """Shoe.shuffle and dealing every card of the shoe with Shoe.deal."""
+    shoe = Shoe(decks, random.Random(seed))
+    size = len(shoe.cards)
+
+    def deal():
+        for i in range(shoes):
+            shoe.shuffle()
+            for j in range(size):
+                shoe.deal()
+        return shoes * size
+
+    def shuffle():
+        for i in range(shoes):
+            shoe.shuffle()
+        return shoes
+    return {'deal': measure(deal), 'shuffle': measure(shuffle)}
+
+
+def bench_hand(seed: int, hands: int) -> dict:
+    """Hand.add_card for three-card hands and Hand.calculate_total."""
+    rng = random.Random(seed)
+    draws = [rng.choices(CARDS, k=3) for i in range(1000)]
+
+    def add_card():
+        for i in range(hands):
+            card1, card2, card3 = draws[i % 1000]
+            hand = Hand(card1, card2)
+            hand.add_card(card3)
+        return hands * 3
+
+    full = []
+    for card1, card2, card3 in draws:
+        hand = Hand(card1, card2)
+        hand.add_card(card3)
+        full.append(hand)
+
+    def calculate_total():
+        for i in range(hands):
+            full[i % 1000].calculate_total()
+        return hands
+    return {
+            'add_card': measure(add_card),
+            'calculate_total': measure(calculate_total)
+    }
+
+
+def bench_strategy(seed: int, calls: int) -> dict:
+    """Strategy.win and Strategy.lose with a random sequence of results."""
+    rng = random.Random(seed)
+    outcomes = [rng.random() < 0.48 for i in range(1000)]
+    results = {}
+    for name, args in (
+            ('flat', (1, 0, 1, 0, 1000)),
+            ('progression', (2, 1, 1, 0, 500)),
+            ('martingale', (1, 0, 2, '*2', 640))
+    ):
+        def run(strat=Strategy(*args)):
+            for i in range(calls):
+                if outcomes[i % 1000]:
+                    strat.win()
+                else:
+                    strat.lose()
+            return calls
+        results[name] = measure(run)
+    return results
+
+
+def bench_classic(players: int, decks: int, seed: int, rounds: int) -> dict:
+    """Blackjack.play_hand and play_dealer, timed separately."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Blackjack(decks, players, seed=seed)
+    game.display = False
+    timings = {}
+
+    def run(name):
+        def play():
+            elapsed = {'play_hand': 0.0, 'play_dealer': 0.0}
+            clock = time.perf_counter
+            for i in range(rounds):
+                game.deal_round()
+                start = clock()
+                for player in game.players:
+                    game.play_hand(player)
+                middle = clock()
+                game.play_dealer()
+                elapsed['play_hand'] += middle - start
+                elapsed['play_dealer'] += clock() - middle
+                game.calculate_winners()
+                game.discard_hands()
+                if game.shoe.shuffleFlag:
+                    game.shoe.shuffle()
+            #Keep the fastest run, ignoring the slow run under tracemalloc.
+            if not tracemalloc.is_tracing():
+                timings[name] = min(timings.get(name, elapsed[name]),
+                        elapsed[name])
+            return rounds * (players if name == 'play_hand' else 1)
+        return play
+
+    results = {}
+    for name in ('play_hand', 'play_dealer'):
+        result = measure(run(name))
+        #Only the time spent inside the function counts.
+        result['seconds'] = timings[name]
+        result['perSecond'] = result['operations'] / timings[name]
+        results[name] = result
+    return results
+
+
+def bench_simulate(
+        players: int, decks: int, seed: int, rounds: int, engine: str
+) -> dict:
+    """End to end Blackjack.simulate_rounds, in hands played."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = Blackjack(decks, players, seed=seed)
+            game.simulate_rounds(rounds, engine=engine)
+        return rounds * players
+    return measure(run, repeat=1)
+
+
+def run_all(rounds: int, seed: int, quick: bool) -> dict:
+    """Run every benchmark and return the results as a dict."""
+    players = [1, 3, 7] if quick else range(1, 8)
+    decks = [1, 6, 8] if quick else range(1, 9)
+    results = {
+            'shoe': {
+                    str(d): bench_shoe(d, seed, max(1, rounds // 50))
+                    for d in decks
+            },
+            'hand': bench_hand(seed, rounds * 10),
+            'strategy': bench_strategy(seed, rounds * 10),
+            'classic': bench_classic(1, 6, seed, rounds),
+            'simulate': {}
+    }
+    for engine in ('fast', 'classic'):
+        for p in players:
+            for d in decks:
+                key = f'{engine} players={p} decks={d}'
+                results['simulate'][key] = bench_simulate(
+                        p, d, seed, rounds, engine
+                )
+                print(f'{key}: {results["simulate"][key]["perSecond"]:,.0f}',
+                        'hands/s')
+    return results
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    """Return the perSecond value of every benchmark keyed by its path."""
+    flat = {}
+    for key, value in results.items():
+        if 'perSecond' in value:
+            flat[prefix + key] = value['perSecond']
+        else:
+            flat.update(flatten(value, f'{prefix}{key}/'))
+    return flat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=2000,
+            help='rounds per benchmark, other sizes scale with it')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output',
+            default=os.path.join(tempfile.gettempdir(), 'benchmark.json'),
+            help='where to save the results, the temp directory by default')
+    parser.add_argument('--compare', help='a previous JSON results file')
+    parser.add_argument('--quick', action='store_true',
+            help='only 1, 3 and 7 players with 1, 6 and 8 decks')
+    args = parser.parse_args()
+    results = run_all(args.rounds, args.seed, args.quick)
+    report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rounds': args.rounds,
+            'seed': args.seed,
+            'results': results
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'Saved results to {args.output}')
+    flat = flatten(results)
+    if args.compare:
+        with open(args.compare) as file:
+            old = flatten(json.load(file)['results'])
+        for key, value in flat.items():
+            if key in old:
+                print(f'{key}: {value/old[key]:.2f}x')
+    else:
+        for key, value in flat.items():
+            if not key.startswith('simulate/'):
+                print(f'{key}: {value:,.0f}/s')
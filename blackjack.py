@@ -3,10 +3,21 @@ according to basic blackjack strategy and give stats on the number of
 hands won/lost as well as the total amount of money won/lost. Useful for
 testing out different betting strategies.
 """
+import random
+import time
+from typing import Iterator
+
+from chart import Action, DecisionTable
 from shoe import Shoe
 from hand import Hand
 from player import Player
-from strategy import Strategy
+from strategy import CountStrategy, Strategy
+from simulator import RoundRecord, Simulator, uses_chart
+from parallel import simulate_parallel
+from profiler import Profiler, count_round
+from checkpoint import run_checkpointed
+from providers import ActionProvider, ChartProvider, HumanProvider
+from stats import run_until
 
 class Blackjack:
     """This class represents a game of blackjack and contains methods to
@@ -63,9 +74,21 @@ class Blackjack:
             '10s': ['s']*10,
             'As': ['p']*10
     }
+    #The three charts above compiled into one table of Actions. Every Hand
+    #played automatically looks its move up here.
+    TABLE = DecisionTable(CHART, SOFTCHART, SPLITCHART)
+    #Plays every Player without a provider of their own when simulating.
+    AUTO = ChartProvider()
+    #The Hand option each move needs. Standing is always allowed.
+    MOVE_OPTIONS = {
+            Action.HIT: Hand.HIT,
+            Action.DOUBLE_STAND: Hand.DOUBLE,
+            Action.DOUBLE_HIT: Hand.DOUBLE,
+            Action.SPLIT: Hand.SPLIT
+    }
     
     def __init__(self, numberOfDecks: int = 6, numberOfPlayers: int = 1, 
-            minBet: int = 10, maxBet: int = 1000):
+            minBet: int = 10, maxBet: int = 1000, seed: int | None = None):
         """Initialize the game with the given number of Players and options.
         
         Keyword arguments:
@@ -74,12 +97,19 @@ class Blackjack:
         numberOfPlayers --  The number of Players in the game. (1 default)
         minBet          --  The minimum bet allowed in the game. (10 default)
         maxBet          --  The maximum bet allowed in the game. (1000 default)
+        seed            --  The seed for the random.Random instance used by the
+                            shoe. Games created with the same seed and played
+                            the same way give exactly the same results. If
+                            None is provided, the shoe is seeded randomly.
+                            (None default)
         """
         self.minBet = minBet
+        self.seed = seed
         self.maxBet = maxBet
         self.numberOfPlayers = numberOfPlayers
         self.numberOfDecks = numberOfDecks
-        self.shoe = Shoe(numberOfDecks)
+        self.shoe = Shoe(numberOfDecks, random.Random(seed))
+        self.table = self.TABLE
         self.shoe.shuffle()
         self.dealer = Player('Dealer')
         self.players = []
@@ -89,7 +119,14 @@ class Blackjack:
         print(f'{self} has been started')
             
     def deal_round(self) -> None:
-        """Add 2 cards to each Player's Hand and the dealer's Hand."""
+        """Add 2 cards to each Player's Hand and the dealer's Hand.
+        
+        The shoe is shuffled first if it cannot deal all of these cards,
+        then every Player with a CountStrategy places their bet.
+        """
+        self.shoe.start_round(2*len(self.players) + 2)
+        for player in self.players:
+            player.place_bet()
         for player in self.players:
             player.hands[0].add_card(self.shoe.deal())
         self.dealer.hands[0].add_card(self.shoe.deal())
@@ -160,12 +197,27 @@ class Blackjack:
                 if self.display:
                     print(hand)
                     
-    def play_hand(self, player: Player) -> None:
-        """Play a Player's Hand automatically according to basic strategy.
+    def play_hand(
+            self, player: Player, provider: ActionProvider | None = None
+    ) -> None:
+        """Play each of a Player's Hands with moves from an ActionProvider.
         
-        CHART, SOFTCHART, and SPLITCHART can be modified to adjust how these
-        Hands are played.
+        Every way of playing a round goes through here. The provider is
+        given the moves the Player can make and afford, and a hit, double
+        or split that is not one of them raises a ValueError. Split aces
+        only get one more card each, unless it is another ace that can be
+        split again.
+
+        Keyword arguments:
+        player      --  The Player whose Hands to play.
+        provider    --  The provider that chooses each move. If None is
+                        provided, the Player's own provider is used, or
+                        basic strategy from the game's DecisionTable if they
+                        have none. Use set_charts to adjust how these Hands
+                        are played. (None default)
         """
+        if provider is None:
+            provider = player.provider or self.AUTO
         upCard = self.dealer.hands[0].cards[0]
         i = 0
         currentBets = 1
@@ -174,13 +226,6 @@ class Blackjack:
         if not upCard:
             print('Can\'t play hand. Please deal a round first.')
             return
-        else:
-            if upCard[0] in Hand.TENS:
-                upCardIndex = 8
-            elif upCard[0] == 'A':
-                upCardIndex = 9
-            else:
-                upCardIndex = int(upCard[0]) - 2
         if self.dealer.hands[0].total == 21:
             return
         #Loop for each hand the player has. Allows for splitting.
@@ -191,90 +236,57 @@ class Blackjack:
                 print(f'{player.name}: {activeHand}')
             #Keep looping until this hand is completed.
             while active:
-                #Remove double option if the bank is too low.
-                if 'd' in activeHand.options:
-                    if bank < ((currentBets*bet) + bet):
-                        activeHand.options.remove('d')
-                        activeHand.options.remove('double')
-                #Remove split option if the bank is too low or the Hand has
-                #already been split 3 times.
-                if 'p' in activeHand.options:
-                    if (
-                            bank < ((currentBets*bet) + bet) or
-                            len(player.hands) >= 4
-                    ):
-                        activeHand.options.remove('p')
-                        activeHand.options.remove('split')
-                #Check if this Hand can be split.
-                if 'p' in activeHand.options:
-                    if activeHand.cards[0][0] in Hand.TENS:
-                        key = '10s'
-                    else:
-                        key = str(activeHand.cards[0][0]) + 's'
-                    move = Blackjack.SPLITCHART[key][upCardIndex]
-                    #Split according to SPLITCHART.
-                    if move.startswith('p'):
-                        newHand = Hand(
-                                activeHand.cards[1], 
-                                self.shoe.deal()
-                        )
-                        activeHand.add_card(self.shoe.deal())
-                        #Only allow stand or split after splitting aces.
-                        if activeHand.cards[0][0] == 'A':
-                        
-                            activeHand.options = []
-                            newHand.options = []
-                            if (
-                                   activeHand.cards[1][0] == 'A' and 
-                                   len(player.hands) < 4
-                            ):
-                                activeHand.options.append('s')
-                                activeHand.options.append('stand')
-                                activeHand.options.append('p')
-                                activeHand.options.append('split')
+                #Remove double and split options if the bank is too low and
+                #the split option if the Hand has already been split 3 times.
+                options = activeHand.options
+                if bank < ((currentBets*bet) + bet):
+                    options &= ~(Hand.DOUBLE | Hand.SPLIT)
+                elif len(player.hands) >= 4:
+                    options &= ~Hand.SPLIT
+                move = provider.choose(self, player, activeHand, options)
+                allowed = self.MOVE_OPTIONS.get(move, 0)
+                if allowed and not options & allowed:
+                    raise ValueError(f'{player.name} cannot {move.name} on '
+                            f'{activeHand}')
+                if move == Action.SPLIT:
+                    newHand = Hand(
+                            activeHand.cards[1], 
+                            self.shoe.deal()
+                    )
+                    activeHand.discard(1)
+                    activeHand.add_card(self.shoe.deal())
+                    #Only allow stand or split after splitting aces.
+                    if activeHand.cards[0].value == 11:
+                        for hand in (activeHand, newHand):
+                            hand.options = 0
                             if (
-                                    newHand.cards[1][0] == 'A' and 
+                                    hand.cards[1].value == 11 and 
                                     len(player.hands) < 4
                             ):
-                                newHand.options.append('s')
-                                newHand.options.append('stand')
-                                newHand.options.append('p')
-                                newHand.options.append('split')
-                        player.hands[i] = activeHand
-                        player.add_hand(newHand)
-                        activeHand.discard(1)
-                        if self.display:
-                            firstHand = [c[0]+c[1] for c in activeHand.cards]
-                            firstHand = ' '.join(firstHand)
-                            secondHand = [c[0]+c[1] for c in newHand.cards]
-                            secondHand = ' ' .join(secondHand)
-                            print(f'{player.name} splits:')
-                            print(f'{firstHand} total:', end=' ')
-                            print(f'{activeHand.total}, {secondHand}', end=' ')
-                            print(f'total: {newHand.total}')
-                        continue
-                key = activeHand.total
-                if activeHand.soft:
-                    move = Blackjack.SOFTCHART[key][upCardIndex]
-                else:
-                    move = Blackjack.CHART[key][upCardIndex]
-                #Double according to either the hard or soft chart.
-                if move.startswith('d'):
-                    if 'd' in activeHand.options:
-                        activeHand.double = 2
-                        activeHand.add_card(self.shoe.deal())
-                        active = False
-                        if self.display:
-                            cards = ' '.join([c[0]+c[1] for c in activeHand.cards])
-                            print(f'{player.name} hits:', end=' ')
-                            print(f'{cards} total: {activeHand.total}')
-                    else:
-                        move = move[1:]
-                #Hit according to either the hard or soft chart.
-                if move.startswith('h'):
+                                hand.options = Hand.STAND | Hand.SPLIT
+                    player.add_hand(newHand)
+                    if self.display:
+                        firstHand = [c.name for c in activeHand.cards]
+                        firstHand = ' '.join(firstHand)
+                        secondHand = [c.name for c in newHand.cards]
+                        secondHand = ' ' .join(secondHand)
+                        print(f'{player.name} splits:')
+                        print(f'{firstHand} total:', end=' ')
+                        print(f'{activeHand.total}, {secondHand}', end=' ')
+                        print(f'total: {newHand.total}')
+                    continue
+                if move >= Action.DOUBLE_STAND:
+                    activeHand.double = 2
+                    activeHand.add_card(self.shoe.deal())
+                    active = False
+                    if self.display:
+                        cards = ' '.join([c.name for c in activeHand.cards])
+                        print(f'{player.name} hits:', end=' ')
+                        print(f'{cards} total: {activeHand.total}')
+                if move == Action.HIT:
                     activeHand.add_card(self.shoe.deal())
                     if self.display:
-                        cards = ' '.join([c[0]+c[1] for c in activeHand.cards])
+                        cards = ' '.join([c.name for c in activeHand.cards])
                         print(f'{player.name} hits:', end=' ')
                         print(f'{cards} total: {activeHand.total}')
                 #Check if this Hand is over.
@@ -282,7 +294,7 @@ class Blackjack:
                         not activeHand.options or
                         activeHand.bust or
                         activeHand.total == 21 or
-                        move.startswith('s')
+                        move == Action.STAND
                 ):
                     if self.display:
                         if activeHand.bust:
@@ -295,134 +307,77 @@ class Blackjack:
             #Move to the next Hand.
             i += 1        
 
+    def set_charts(
+            self, chart: dict | None = None, softChart: dict | None = None,
+            splitChart: dict | None = None
+    ) -> None:
+        """Replace basic strategy charts for this game and recompile them.
+        
+        Charts must be in the same format as CHART, SOFTCHART and SPLITCHART.
+        
+        Keyword arguments:
+        chart       --  The new hard total chart. If None is provided, the
+                        current chart is kept. (None default)
+        softChart   --  The new soft total chart. (None default)
+        splitChart  --  The new split chart. (None default)
+        """
+        if chart is not None:
+            self.CHART = chart
+        if softChart is not None:
+            self.SOFTCHART = softChart
+        if splitChart is not None:
+            self.SPLITCHART = splitChart
+        self.table = DecisionTable(self.CHART, self.SOFTCHART, self.SPLITCHART)
+
     def discard_hands(self) -> None:
         """Reinitialize hands for all players and the dealer."""
         for player in self.players:
             player.discard_hands()
         self.dealer.discard_hands()
         
-    def check_ins(self) -> bool:
+    def check_ins(self, provider: ActionProvider | None = None) -> bool:
         """Check to see if any player wants to take insurance. 
         
         Return True if the dealer has blackjack and False otherwise.
+
+        Keyword arguments:
+        provider    --  The provider asked for every Player without one of
+                        their own. If None is provided, each Player is
+                        prompted. (None default)
         """
         dHand = self.dealer.hands[0]
-        CHOICES = {'y', 'yes', 'n', 'no'}
-        if dHand.cards[0][0] == 'A':
+        if provider is None:
+            provider = HumanProvider()
+        if dHand.cards[0].value == 11:
             for player in self.players:
-                invalid = True
-                while invalid:
-                    response = input(
-                            f'{player.name} ${player.bank}: ' +
-                            'Do you want to take insurance?'
-                    )
-                    response = response.lower()
-                    if response in CHOICES:
-                        invalid = False
-                        if response in {'y', 'yes'}:
-                            if not dHand.bj:
-                                player.bank -= player.bet / 2
-                        """if response in {'n', 'no'}:
-                            if dHand.bj and not player.hands[0].bj:
-                                player.lose(player.bet)"""
-                    else:
-                        print('Please respond with (Y)es or (N)o')
+                if (player.provider or provider).insurance(self, player):
+                    if not dHand.bj:
+                        player.bank -= player.bet / 2
             if dHand.bj:
                 print(f'{self.dealer.name} has blackjack')
             else:
                 print(f'{self.dealer.name} doesn\'t have blackjack')
         return dHand.bj
             
-    def play_round(self) -> None:
-        """Deal a round and prompt for input on how to play each player's Hand.
+    def play_round(self, provider: ActionProvider | None = None) -> None:
+        """Deal a round and play each player's Hands with play_hand, printing
+        every step.
+
+        Keyword arguments:
+        provider    --  The provider that chooses moves for every Player
+                        without one of their own. If None is provided, each
+                        move is prompted for with input(). (None default)
         """
+        if provider is None:
+            provider = HumanProvider()
         self.deal_round()
         self.show_hands()
-        if not self.check_ins():
+        if not self.check_ins(provider):
             for player in self.players:
-                i = 0
-                currentBets = 1
-                bet = player.bet
-                bank = player.bank
                 print(f'{player.name}:')
                 print(f'Bank: ${player.bank-player.bet} ', end='')
                 print(f'Bet: ${player.bet}')
-                #Allow a player to act on all hands.
-                while i < len(player.hands):
-                    active = True
-                    activeHand = player.hands[i]
-                    print(activeHand)
-                    #Keep prompting until this hand is completed.
-                    while active:
-                        invalid = True
-                        while invalid:
-                            if activeHand.options:
-                                if 'd' in activeHand.options:
-                                    if bank < ((currentBets*bet) + bet):
-                                        activeHand.options.remove('d')
-                                        activeHand.options.remove('double')
-                                if 'p' in activeHand.options:
-                                    if (
-                                            bank < ((currentBets*bet) + bet) or
-                                            len(player.hands) >= 4
-                                    ):
-                                        activeHand.options.remove('p')
-                                        activeHand.options.remove('split')
-                                response = input(
-                                        f'{activeHand.str_options()}? '
-                                )
-                                response = response.lower()
-                                if response in activeHand.options:
-                                    invalid = False
-                                else:
-                                    print('Invalid action')
-                            else:
-                                invalid = False
-                                active = False
-                                response = ''
-                        if response in {'s', 'stand'}:
-                            active = False
-                        if response in {'h', 'hit'}:
-                            activeHand.add_card(self.shoe.deal())
-                            print(activeHand)
-                            if activeHand.bj or activeHand.bust:
-                                active = False
-                        elif response in {'d', 'double'}:
-                            activeHand.double = 2
-                            activeHand.add_card(self.shoe.deal())
-                            print(activeHand)
-                            active = False
-                        elif response in {'p', 'split'}:
-                            newHand = Hand(
-                                    activeHand.cards[1], 
-                                    self.shoe.deal()
-                            )
-                            activeHand.discard(1)
-                            activeHand.add_card(self.shoe.deal())
-                            #Only allow stand or split after splitting aces.
-                            if activeHand.cards[0][0] == 'A':
-                                activeHand.options = []
-                                newHand.options = []
-                                if (
-                                       activeHand.cards[1][0] == 'A' and 
-                                       len(player.hands) < 4
-                                ):
-                                    activeHand.options.append('s')
-                                    activeHand.options.append('stand')
-                                    activeHand.options.append('p')
-                                    activeHand.options.append('split')
-                                if (
-                                        newHand.cards[1][0] == 'A' and 
-                                        len(player.hands) < 4
-                                ):
-                                    newHand.options.append('s')
-                                    newHand.options.append('stand')
-                                    newHand.options.append('p')
-                                    newHand.options.append('split')
-                            player.hands[i] = activeHand
-                            player.add_hand(newHand)
-                            print(activeHand)
-                    i += 1
+                self.play_hand(player, player.provider or provider)
         print()
         self.play_dealer()
         self.calculate_winners()
@@ -433,7 +388,12 @@ class Blackjack:
             self.shoe.shuffle()
             
     def simulate_rounds(self, rounds: int = 100, 
-            display: bool = False) -> None:
+            display: bool = False, engine: str = 'fast',
+            workers: int = 1, profiler: Profiler | None = None,
+            checkpoint: str | None = None,
+            checkpointInterval: float = 300.0,
+            precision: float | None = None,
+            timeBudget: float | None = None) -> None:
         """Deal a number of rounds and play all hands automatically. 
         
         Statistics are calculated and printed for each player. These statistics
@@ -444,30 +404,170 @@ class Blackjack:
         display --  When this flag is set to True Hands and actions will be
                     printed to the screen. When the flag is set to False only
                     the resulting statistics will be printed. (False default)
+        engine  --  'fast' plays the rounds with a Simulator when display is
+                    False. 'classic' always plays them with play_hand,
+                    play_dealer and calculate_winners. Both give the same
+                    results. Rounds are always played the classic way, in
+                    one process, when any Player has a provider.
+                    ('fast' default)
+        workers --  The number of processes to split the rounds across. When
+                    this is more than 1 the rounds are played with
+                    simulate_parallel and display is ignored. Workers play
+                    with an unlimited bank, so bets are not limited by the
+                    bank. (1 default)
+        profiler--  When a Profiler is provided, the time spent in each
+                    phase of a round and counts of events are added to it
+                    by the engine playing the rounds, including with
+                    checkpoint, precision or timeBudget. Without one the
+                    engines only check a flag. Profiling is not done across
+                    multiple workers, so a ValueError is raised if both are
+                    given. (None default)
+        checkpoint
+                --  A file to save checkpoints to. If it already holds a
+                    checkpoint of an interrupted run of the same number of
+                    rounds, the run is resumed from it and finishes exactly
+                    as it would have without the interruption. The file is
+                    removed when the run is complete. (None default)
+        checkpointInterval
+                --  The number of seconds between checkpoints.
+                    (300.0 default)
+        precision
+                --  When provided, stop as soon as the 95% confidence
+                    interval on every player's net winnings per round is
+                    within this many dollars of the mean, with rounds as the
+                    most to play. The precision reached is printed. Not
+                    used with multiple workers or checkpointing.
+                    (None default)
+        timeBudget
+                --  When provided, stop after about this many seconds even
+                    if the precision has not been reached. (None default)
         """
         self.display = display
+        if not uses_chart(self):
+            #Simulators and workers only play by the chart.
+            engine, workers = 'classic', 1
         print(f'Simulating {rounds} hands...')
+        self._run_engine(rounds, engine, workers, profiler, checkpoint,
+                checkpointInterval, precision, timeBudget)
+        for player in self.players:
+            player.get_stats()
+            print()
+        self.display = True
+
+    def _run_engine(
+            self, rounds: int, engine: str, workers: int,
+            profiler: Profiler | None, checkpoint: str | None,
+            checkpointInterval: float, precision: float | None,
+            timeBudget: float | None
+    ) -> None:
+        """Play the rounds for simulate_rounds with the one engine its
+        arguments call for.
+        """
+        if workers > 1:
+            if profiler is not None:
+                raise ValueError('Profiling is not done across workers.')
+            self.display = False
+            simulate_parallel(self, rounds, workers, checkpoint=checkpoint,
+                    interval=checkpointInterval)
+            return
+        if checkpoint is not None:
+            run_checkpointed(self, rounds, checkpoint, checkpointInterval,
+                    engine, profiler)
+            return
+        if precision is not None or timeBudget is not None:
+            stats, played = run_until(self, rounds, precision, timeBudget,
+                    engine=engine, profiler=profiler)
+            print(f'Stopped after {played} hands.')
+            for player, s in zip(self.players, stats):
+                print(f'{player.name}: {s.mean:+.2f} ± '
+                        f'{s.interval():.2f} per hand (95%)')
+            print()
+            return
+        if engine == 'fast' and not self.display:
+            Simulator(self, profiler).run(rounds)
+            return
+        self.play_rounds(rounds, profiler)
+
+    def play_rounds(
+            self, rounds: int = 100, profiler: Profiler | None = None
+    ) -> None:
+        """Deal and play a number of rounds with play_hand, play_dealer and
+        calculate_winners, printing hands and actions if display is set.
+
+        Keyword arguments:
+        rounds      --  The number of rounds to play through. (100 default)
+        profiler    --  A Profiler to add the time of each phase of every
+                        round and counts of events to. Without one only a
+                        flag is checked. (None default)
+        """
+        shoe = self.shoe
+        timing = profiler is not None
+        if timing:
+            clock = time.perf_counter
+            add = profiler.add
         for i in range(rounds):
+            if timing:
+                start = clock()
             self.deal_round()
+            if timing:
+                add('deal_round', clock() - start)
             if self.display:
-                print('Dealer shows: {}{}'.format(*self.dealer.hands[0].cards[0]))
+                print(f'Dealer shows: {self.dealer.hands[0].cards[0]}')
             for player in self.players:
+                if timing:
+                    start = clock()
                 self.play_hand(player)
+                if timing:
+                    add('play_hand', clock() - start)
+            if timing:
+                start = clock()
             self.play_dealer()
+            if timing:
+                now = clock()
+                add('play_dealer', now - start)
+                start = now
             self.calculate_winners()
+            if timing:
+                now = clock()
+                add('calculate_winners', now - start)
+                count_round(profiler, [
+                        [(h.total, h.bj, h.double) for h in player.hands]
+                        for player in self.players
+                ], self.dealer.hands[0].bj, shoe.roundStart - shoe.cursor)
+                start = clock()
             self.discard_hands()
-            if self.shoe.shuffleFlag:
-                self.shoe.shuffle()
+            if timing:
+                add('discard_hands', clock() - start)
+            if shoe.shuffleFlag:
+                if timing:
+                    start = clock()
+                shoe.shuffle()
+                if timing:
+                    add('shuffle', clock() - start)
+                    profiler.count('shuffles')
             if self.display:
                 print()
-        for player in self.players:
-            player.get_stats()
-            print()
-        self.display = True
-        
+
+    def iter_rounds(self, rounds: int = 100) -> Iterator[RoundRecord]:
+        """Play a number of rounds and yield a RoundRecord for each player.
+
+        Nothing is printed and the rounds are played lazily as records are
+        requested, so very long runs can be streamed in constant memory.
+        For example, to stop as soon as any player's bank falls below $50:
+            for record in game.iter_rounds(10**9):
+                if record.bank < 50:
+                    break
+        The rounds are played by a Simulator, so a ValueError is raised if
+        any Player has a provider.
+
+        Keyword arguments:
+        rounds  --  The number of rounds to play through. (100 default)
+        """
+        return Simulator(self).iter_rounds(rounds)
+
     def add_player(
             self, name: str = None, bet: float = 10.0, bank: float = 100.0, 
-            strat: Strategy = None
+            strat: Strategy = None, provider: ActionProvider | None = None
     ) -> None:
         """Add a player.
         
@@ -478,12 +578,21 @@ class Blackjack:
         bank    --  The amount of money the Player will have available. 
                     (100.0 default)
         strat   --  The betting Strategy to be used for this Player. If None is
-                    provided, the bet will remain the same every round. 
+                    provided, the bet will remain the same every round. A
+                    CountStrategy without a shoe is given this game's shoe.
                     (None default)
+        provider--  The providers.ActionProvider that chooses the new
+                    Player's moves. If None is provided, basic strategy is
+                    used when simulating and moves are prompted for in
+                    play_round. (None default)
         """
         if not name:
             name = 'Player ' + str(len(self.players)+1)
-        self.players.append(Player(name, bet, bank, self.minBet, strat))
+        if isinstance(strat, CountStrategy) and strat.shoe is None:
+            strat.shoe = self.shoe
+        self.players.append(
+                Player(name, bet, bank, self.minBet, strat, provider)
+        )
         
     def remove_player(self, index: int = -1) -> None:
         """Remove a player.
@@ -0,0 +1,73 @@
+class Card:
+    """This class represents a single playing card.
+
+    Only 52 Cards are ever created, one for each rank and suit, and they are
+    stored in CARDS. Decks, Shoes and Hands all hold references to these
+    shared Cards so dealing and shuffling never have to build new objects.
+    The blackjack point value of the card is precomputed so it never has to
+    be parsed from the rank.
+    """
+    SUITS = ['C', 'D', 'H', 'S']
+    RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    TENS = ['10', 'J', 'Q', 'K']
+    __slots__ = ('rank', 'suit', 'value', 'index', 'name')
+
+    def __init__(self, rank: str, suit: str, index: int):
+        """Initialize a new Card.
+
+        Keyword arguments:
+        rank    --  The rank of the card, one of RANKS.
+        suit    --  The suit of the card, one of SUITS.
+        index   --  The position of this card in CARDS.
+        """
+        self.rank = rank
+        self.suit = suit
+        self.index = index
+        self.name = rank + suit
+        if rank == 'A':
+            self.value = 11
+        elif rank in Card.TENS:
+            self.value = 10
+        else:
+            self.value = int(rank)
+
+    @staticmethod
+    def get(rank: str, suit: str) -> 'Card':
+        """Return the shared Card with the given rank and suit.
+
+        Raises a ValueError if the rank or suit is not valid.
+        """
+        if rank not in Card.RANKS or suit not in Card.SUITS:
+            raise ValueError(f'Invalid card: {rank}{suit}')
+        return CARDS[Card.SUITS.index(suit)*13 + Card.RANKS.index(rank)]
+
+    def __reduce__(self):
+        """Unpickle to the shared Card instead of creating a copy."""
+        return (_card_from_index, (self.index,))
+
+    def __repr__(self) -> str:
+        """Return the rank and suit of this Card, e.g. 'AS'."""
+        return self.name
+
+    def __str__(self) -> str:
+        """Return the rank and suit of this Card, e.g. 'AS'."""
+        return self.name
+
+
+#All 52 cards in the order of a new deck.
+CARDS = tuple(
+        Card(rank, suit, i*13 + j)
+        for i, suit in enumerate(Card.SUITS)
+        for j, rank in enumerate(Card.RANKS)
+)
+
+
+def _card_from_index(index: int) -> Card:
+    """Return the shared Card at the given index of CARDS."""
+    return CARDS[index]
+
+
+if __name__ == '__main__':
+    print(CARDS)
+    myCard = Card.get('Q', 'H')
+    print(f'{myCard} is worth {myCard.value}')
@@ -0,0 +1,90 @@
+"""Basic strategy charts compiled into a dense table of actions.
+
+The charts in Blackjack are written for people to read: dicts of lists of
+strings like 'dh'. A DecisionTable compiles them once into a flat list of
+Action values so every engine can look up a move with a single index.
+"""
+from enum import IntEnum
+
+
+class Action(IntEnum):
+    """The moves found in a basic strategy chart.
+
+    DOUBLE_STAND and DOUBLE_HIT mean double if possible and otherwise stand
+    or hit. Subtracting 2 from either gives the fallback move.
+    """
+    STAND = 0
+    HIT = 1
+    DOUBLE_STAND = 2
+    DOUBLE_HIT = 3
+    SPLIT = 4
+
+
+class DecisionTable:
+    """This class holds the hard, soft and split charts as one flat list.
+
+    actions is indexed by section + total*10 + upCardIndex, where the
+    section is HARD, SOFT or PAIR and upCardIndex is the dealer's up card
+    value minus 2. The PAIR section is indexed by the value of one card of
+    the pair instead of the total and only holds SPLIT where the pair
+    should be split. Entries that are missing from the charts are None.
+    """
+    CODES = {
+            's': Action.STAND,
+            'h': Action.HIT,
+            'ds': Action.DOUBLE_STAND,
+            'dh': Action.DOUBLE_HIT,
+            'p': Action.SPLIT
+    }
+    HARD, SOFT, PAIR = 0, 320, 640
+
+    def __init__(self, chart: dict, softChart: dict, splitChart: dict):
+        """Compile the given charts.
+
+        Keyword arguments:
+        chart       --  The hard total chart, in the format of
+                        Blackjack.CHART.
+        softChart   --  The soft total chart, in the format of
+                        Blackjack.SOFTCHART.
+        splitChart  --  The split chart, in the format of
+                        Blackjack.SPLITCHART.
+        """
+        self.actions = [None] * (DecisionTable.PAIR + 120)
+        for section, source in (
+                (DecisionTable.HARD, chart), (DecisionTable.SOFT, softChart)
+        ):
+            for total, moves in source.items():
+                for upCardIndex, move in enumerate(moves):
+                    self.actions[section + total*10 + upCardIndex] = (
+                            DecisionTable.CODES.get(move)
+                    )
+        for key, moves in splitChart.items():
+            rank = key[:-1]
+            value = 11 if rank == 'A' else int(rank)
+            index = DecisionTable.PAIR + value*10
+            for upCardIndex, move in enumerate(moves):
+                if move.startswith('p'):
+                    self.actions[index + upCardIndex] = Action.SPLIT
+
+    def lookup(self, total: int, soft: bool, upCardIndex: int) -> Action:
+        """Return the chart move for a hand that is not being split."""
+        if soft:
+            return self.actions[DecisionTable.SOFT + total*10 + upCardIndex]
+        return self.actions[total*10 + upCardIndex]
+
+    def split(self, value: int, upCardIndex: int) -> bool:
+        """Return True if a pair of cards with this value should be split."""
+        return (
+                self.actions[DecisionTable.PAIR + value*10 + upCardIndex] ==
+                Action.SPLIT
+        )
+
+
+if __name__ == '__main__':
+    from blackjack import Blackjack
+    myTable = DecisionTable(
+            Blackjack.CHART, Blackjack.SOFTCHART, Blackjack.SPLITCHART
+    )
+    print(f'Hard 11 vs 6: {myTable.lookup(11, False, 4).name}')
+    print(f'Soft 18 vs 9: {myTable.lookup(18, True, 7).name}')
+    print(f'Split 8s vs A: {myTable.split(8, 9)}')
@@ -0,0 +1,147 @@
+"""Checkpoints that let long simulations be stopped and resumed.
+
+A checkpoint is the whole Blackjack game pickled together with how far the
+run has got. Pickling the game captures everything the rest of the run
+depends on: the shoe's card order, cursor and cut card, the state of its
+random.Random, every Player's bank, debt, bet and statistics and every
+Strategy's position and streaks. Cards pickle as references to the shared
+CARDS, so a checkpoint of a 6 deck game is a few kilobytes and takes well
+under a millisecond to write.
+
+Checkpoints are written to a temporary file and moved into place with
+os.replace, so an interruption while saving never leaves a broken file.
+"""
+import os
+import pickle
+import time
+
+from profiler import Profiler
+from simulator import Simulator, uses_chart
+
+#The number of rounds played between checks of the time.
+BLOCK_ROUNDS = 10000
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    """Write a checkpoint atomically.
+
+    Keyword arguments:
+    path    --  The file to write.
+    state   --  A dict of everything to save. Anything that can be pickled
+                may be included.
+    """
+    temp = f'{path}.tmp'
+    with open(temp, 'wb') as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+
+
+def load_checkpoint(path: str) -> dict | None:
+    """Return the state saved in a checkpoint, or None if there is none."""
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def restore(game, saved) -> None:
+    """Make game continue exactly where a saved copy of it left off.
+
+    The game keeps its identity, but its shoe, Players and Strategies are
+    replaced by the saved ones, so hold on to the game rather than to its
+    Players across a resume.
+    """
+    game.__dict__.update(saved.__dict__)
+
+
+def fingerprint(game, engine: str) -> tuple:
+    """Return what a game must share with a checkpoint to resume from it.
+
+    This is the game's seed, shoe and table minimum, the engine and each
+    Player's name, bank, bet and Strategy, taken before any rounds of the
+    run are played.
+    """
+    return (
+            game.seed, game.numberOfDecks, game.minBet, engine,
+            tuple(
+                    (player.name, player.bank, player.bet,
+                            type(player.strat).__name__, str(player.strat))
+                    for player in game.players
+            )
+    )
+
+
+def check_checkpoint(
+        path: str, state: dict, rounds: int, game, engine: str
+) -> None:
+    """Raise a ValueError unless a checkpoint is of the same run.
+
+    Keyword arguments:
+    path    --  The checkpoint file, for the message.
+    state   --  The state loaded from path.
+    rounds  --  The total number of rounds in the run.
+    game    --  The game about to be restored, before any rounds are
+                played.
+    engine  --  The engine the run plays with.
+    """
+    if state['rounds'] != rounds:
+        raise ValueError(
+                f'{path} is a checkpoint of a {state["rounds"]} round run'
+        )
+    if state.get('fingerprint') != fingerprint(game, engine):
+        raise ValueError(
+                f'{path} is a checkpoint of a different game, seed, set of '
+                f'players or engine'
+        )
+
+
+def run_checkpointed(
+        game, rounds: int, path: str, interval: float = 300.0,
+        engine: str = 'fast', profiler: Profiler | None = None
+) -> None:
+    """Play rounds for a game, saving a checkpoint every interval seconds.
+
+    If path already holds a checkpoint for a run of the same length, the
+    game is restored from it and only the remaining rounds are played, so
+    the results are exactly those of an uninterrupted run. A checkpoint of
+    a game with a different seed, shoe, Players or engine raises a
+    ValueError instead, see fingerprint. The checkpoint is removed once
+    every round has been played.
+
+    Keyword arguments:
+    game        --  The Blackjack game to simulate.
+    rounds      --  The total number of rounds in the run.
+    path        --  The checkpoint file.
+    interval    --  The number of seconds between checkpoints.
+                    (300.0 default)
+    engine      --  'fast' plays with a Simulator unless the game is
+                    displaying hands or a Player has a provider, 'classic'
+                    with Blackjack.play_rounds. ('fast' default)
+    profiler    --  A Profiler for the engine to add the time of each phase
+                    and counts of events to. Only the rounds played since
+                    the last resume are profiled. (None default)
+    """
+    done = 0
+    fast = engine == 'fast' and not game.display and uses_chart(game)
+    engine = 'fast' if fast else 'classic'
+    key = fingerprint(game, engine)
+    state = load_checkpoint(path)
+    if state is not None:
+        check_checkpoint(path, state, rounds, game, engine)
+        restore(game, state['game'])
+        done = state['done']
+    last = time.monotonic()
+    while done < rounds:
+        block = min(BLOCK_ROUNDS, rounds - done)
+        if fast:
+            Simulator(game, profiler).run(block)
+        else:
+            game.play_rounds(block, profiler)
+        done += block
+        if done < rounds and time.monotonic() - last >= interval:
+            save_checkpoint(path, {'rounds': rounds, 'done': done,
+                    'fingerprint': key, 'game': game})
+            last = time.monotonic()
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,45 @@
+"""Card counting tag systems.
+
+A tag system gives every rank a tag that is added to the running count when
+a card of that rank is dealt. All of the systems here are balanced: a full
+deck adds up to 0, so dividing the running count by the number of decks
+left gives a meaningful true count. Pass any of them, or a dict of your
+own, to Shoe.set_tags.
+"""
+from card import Card
+
+HI_LO = {
+        'A': -1, '2': 1, '3': 1, '4': 1, '5': 1, '6': 1, '7': 0, '8': 0,
+        '9': 0, '10': -1, 'J': -1, 'Q': -1, 'K': -1
+}
+HI_OPT_I = {
+        'A': 0, '2': 0, '3': 1, '4': 1, '5': 1, '6': 1, '7': 0, '8': 0,
+        '9': 0, '10': -1, 'J': -1, 'Q': -1, 'K': -1
+}
+HI_OPT_II = {
+        'A': 0, '2': 1, '3': 1, '4': 2, '5': 2, '6': 1, '7': 1, '8': 0,
+        '9': 0, '10': -2, 'J': -2, 'Q': -2, 'K': -2
+}
+OMEGA_II = {
+        'A': 0, '2': 1, '3': 1, '4': 2, '5': 2, '6': 2, '7': 1, '8': 0,
+        '9': -1, '10': -2, 'J': -2, 'Q': -2, 'K': -2
+}
+ZEN = {
+        'A': -1, '2': 1, '3': 1, '4': 2, '5': 2, '6': 2, '7': 1, '8': 0,
+        '9': 0, '10': -2, 'J': -2, 'Q': -2, 'K': -2
+}
+SYSTEMS = {
+        'hi-lo': HI_LO, 'hi-opt i': HI_OPT_I, 'hi-opt ii': HI_OPT_II,
+        'omega ii': OMEGA_II, 'zen': ZEN
+}
+
+
+def compile_tags(tags: dict) -> tuple:
+    """Return the tag of every Card in CARDS, indexed by Card.index.
+
+    Raises a ValueError if a rank is missing from tags.
+    """
+    missing = [rank for rank in Card.RANKS if rank not in tags]
+    if missing:
+        raise ValueError(f'Tag system is missing ranks: {missing}')
+    return tuple(tags[rank] for suit in Card.SUITS for rank in Card.RANKS)
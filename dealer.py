@@ -0,0 +1,233 @@
+"""Exact dealer outcome probabilities and expected values for decisions.
+
+Instead of dealing cards, these functions work from the composition of the
+cards left in the shoe: a tuple of 10 counts for the point values 2 through
+11 (aces). The dealer's hand is played out over every possible sequence of
+draws, following the same rules as Blackjack.play_dealer, and the results
+are memoized in LRU caches keyed by the hand and composition.
+"""
+from functools import lru_cache
+
+#The order of the probabilities returned by dealer_probabilities.
+OUTCOMES = (17, 18, 19, 20, 21, 'bust', 'blackjack')
+#The largest number of results kept in each cache.
+CACHE_SIZE = 1 << 18
+
+
+def composition(cards) -> tuple[int, ...]:
+    """Return the composition of a list of Cards.
+
+    To get the composition of the cards left in a Shoe, pass
+    shoe.cards[:shoe.cursor].
+    """
+    counts = [0] * 10
+    for card in cards:
+        counts[card.value - 2] += 1
+    return tuple(counts)
+
+
+def _add(total: int, soft: bool, value: int) -> tuple[int, bool]:
+    """Return the total and soft flag after adding a card to a hand.
+
+    These are the same rules as Hand.add_card.
+    """
+    if value == 11:
+        if total+11 > 21:
+            total += 1
+        else:
+            total += 11
+            soft = True
+    else:
+        total += value
+    if total > 21 and soft:
+        total -= 10
+        soft = False
+    return total, soft
+
+
+def _remove(composition: tuple[int, ...], index: int) -> tuple[int, ...]:
+    """Return the composition with one card removed."""
+    return composition[:index] + (composition[index]-1,) + composition[index+1:]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _finish_dealer(
+        total: int, soft: bool, composition: tuple[int, ...],
+        hitSoft17: bool
+) -> tuple[float, ...]:
+    """Return the probabilities of each final dealer total from a hand."""
+    if total > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+    if total > 17 or (total == 17 and not (soft and hitSoft17)):
+        probabilities = [0.0] * 7
+        probabilities[total - 17] = 1.0
+        return tuple(probabilities)
+    remaining = sum(composition)
+    probabilities = [0.0] * 7
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        newTotal, newSoft = _add(total, soft, index + 2)
+        result = _finish_dealer(
+                newTotal, newSoft, _remove(composition, index), hitSoft17
+        )
+        weight = count / remaining
+        for i in range(7):
+            probabilities[i] += weight * result[i]
+    return tuple(probabilities)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def dealer_probabilities(
+        upValue: int, composition: tuple[int, ...],
+        noBlackjack: bool = False, hitSoft17: bool = True
+) -> tuple[float, ...]:
+    """Return the probability of each dealer outcome, in the order of OUTCOMES.
+
+    Keyword arguments:
+    upValue     --  The point value of the dealer's up card (2-11).
+    composition --  The cards left in the shoe, including the dealer's hole
+                    card but not the up card.
+    noBlackjack --  When True the probabilities are given knowing the dealer
+                    does not have blackjack, which is the case whenever a
+                    player gets to play their hand. (False default)
+    hitSoft17   --  Whether the dealer hits soft 17, as in
+                    Blackjack.play_dealer. (True default)
+
+    Raises ValueError if composition has no cards the hole card could be.
+    """
+    probabilities = [0.0] * 7
+    remaining = 0
+    for index, count in enumerate(composition):
+        value = index + 2
+        if not count or (noBlackjack and upValue + value == 21):
+            continue
+        remaining += count
+        if upValue + value == 21:
+            probabilities[6] += count
+            continue
+        total, soft = _add(*_add(0, False, upValue), value)
+        result = _finish_dealer(
+                total, soft, _remove(composition, index), hitSoft17
+        )
+        for i in range(7):
+            probabilities[i] += count * result[i]
+    if not remaining:
+        raise ValueError('composition has no cards')
+    return tuple(p / remaining for p in probabilities)
+
+
+def stand_value(
+        total: int, upValue: int, composition: tuple[int, ...],
+        hitSoft17: bool = True
+) -> float:
+    """Return the expected units won by standing on total.
+
+    The dealer is known not to have blackjack and the hand is not a
+    blackjack itself.
+    """
+    if total > 21:
+        return -1.0
+    probabilities = dealer_probabilities(
+            upValue, composition, True, hitSoft17
+    )
+    value = probabilities[5]
+    for i, dTotal in enumerate(OUTCOMES[:5]):
+        if dTotal < total:
+            value += probabilities[i]
+        elif dTotal > total:
+            value -= probabilities[i]
+    return value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _best_value(
+        total: int, soft: bool, upValue: int, composition: tuple[int, ...],
+        hitSoft17: bool
+) -> float:
+    """Return the expected units of a hand played perfectly by standing or
+    hitting.
+    """
+    stand = stand_value(total, upValue, composition, hitSoft17)
+    if total >= 21:
+        return stand
+    return max(stand, _hit_value(total, soft, upValue, composition, hitSoft17))
+
+
+def _hit_value(
+        total: int, soft: bool, upValue: int, composition: tuple[int, ...],
+        hitSoft17: bool
+) -> float:
+    """Return the expected units of taking one card and then playing
+    perfectly.
+    """
+    remaining = sum(composition)
+    value = 0.0
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        newTotal, newSoft = _add(total, soft, index + 2)
+        if newTotal > 21:
+            result = -1.0
+        else:
+            result = _best_value(
+                    newTotal, newSoft, upValue, _remove(composition, index),
+                    hitSoft17
+            )
+        value += count / remaining * result
+    return value
+
+
+def expected_values(
+        total: int, soft: bool, upValue: int, composition: tuple[int, ...],
+        hitSoft17: bool = True
+) -> dict[str, float]:
+    """Return the exact expected units for standing, hitting and doubling.
+
+    Hitting assumes the rest of the hand is played perfectly by standing or
+    hitting. The dealer is known not to have blackjack.
+
+    Keyword arguments:
+    total       --  The player's current total.
+    soft        --  Whether the player's total is soft.
+    upValue     --  The point value of the dealer's up card (2-11).
+    composition --  The cards left in the shoe, including the dealer's hole
+                    card.
+    hitSoft17   --  Whether the dealer hits soft 17. (True default)
+    """
+    remaining = sum(composition)
+    if not remaining:
+        raise ValueError('composition has no cards')
+    double = 0.0
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        newTotal, newSoft = _add(total, soft, index + 2)
+        double += count / remaining * stand_value(
+                newTotal, upValue, _remove(composition, index), hitSoft17
+        )
+    return {
+            'stand': stand_value(total, upValue, composition, hitSoft17),
+            'hit': _hit_value(total, soft, upValue, composition, hitSoft17),
+            'double': 2 * double
+    }
+
+
+def cache_clear() -> None:
+    """Empty every cache used by this module."""
+    _finish_dealer.cache_clear()
+    dealer_probabilities.cache_clear()
+    _best_value.cache_clear()
+
+
+if __name__ == '__main__':
+    from card import CARDS
+    shoe = list(CARDS) * 6
+    for upValue in range(2, 12):
+        upCard = next(card for card in shoe if card.value == upValue)
+        remaining = list(shoe)
+        remaining.remove(upCard)
+        probabilities = dealer_probabilities(upValue, composition(remaining))
+        display = ' '.join(f'{p:.4f}' for p in probabilities)
+        print(f'{upCard.rank:>2}: {display}')
+    print(_finish_dealer.cache_info())
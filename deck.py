@@ -1,30 +1,34 @@
 import random
 
+from card import Card, CARDS
+
 class Deck:
     """A class representing a standard deck of 52 playing cards"""
-    SUITS = ['C', 'D', 'H', 'S']
-    RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    SUITS = Card.SUITS
+    RANKS = Card.RANKS
 
-    def __init__(self):
+    def __init__(self, rng: random.Random | None = None):
         """Initialize a new Deck.
         
-        Each card is represented as a list in the form [rank, suit].
+        Each card is one of the shared Card objects in card.CARDS.
+        
+        Keyword arguments:
+        rng --  The random.Random instance used to shuffle this Deck. If None
+                is provided, a new unseeded instance is created. (None default)
         """
-        self.cards = []
-        for suit in Deck.SUITS:
-            for rank in Deck.RANKS:
-                self.cards.append([rank, suit])
+        self.rng = rng if rng is not None else random.Random()
+        self.cards = list(CARDS)
         
     def shuffle(self) -> None:
         """Shuffle all cards back into the Deck."""
-        self.__init__()
-        random.shuffle(self.cards)
+        self.cards = list(CARDS)
+        self.rng.shuffle(self.cards)
         
     def shuffle_remaining(self) -> None:
         """Shuffle only the cards that have not been dealt already."""
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
         
-    def deal(self) -> list[str]:
+    def deal(self) -> Card:
         """Remove the last card in the deck and return it."""
         return self.cards.pop()
         
@@ -36,7 +40,7 @@ class Deck:
         """Print a string list of all cards left in the deck."""
         message = ''
         for card in self.cards:
-            message += card[0] + card[1] + ' '
+            message += card.name + ' '
         print(message)
         
     def __str__(self) -> str:
@@ -45,7 +49,7 @@ class Deck:
 
 
 if __name__ == '__main__':
-    myDeck = Deck()
+    myDeck = Deck(random.Random(1))
     myDeck.shuffle()
     print('New deck shuffled')
     print('Dealing 5 cards')
@@ -1,23 +1,36 @@
+from card import Card
+
 class Hand:
     """This class represents one blackjack hand."""
-    SUITS = ['C', 'D', 'H', 'S']
-    RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-    TENS = ['10', 'J', 'Q', 'K']
+    SUITS = Card.SUITS
+    RANKS = Card.RANKS
+    TENS = Card.TENS
+    #Bit flags used in options. ACTIONS maps user input to these flags.
+    STAND, HIT, DOUBLE, SPLIT = 1, 2, 4, 8
+    ACTIONS = {
+            's': STAND, 'stand': STAND,
+            'h': HIT, 'hit': HIT,
+            'd': DOUBLE, 'double': DOUBLE,
+            'p': SPLIT, 'split': SPLIT
+    }
     
-    def __init__(self, card1: list[str] = None, card2: list[str] = None):
+    def __init__(self, card1: Card = None, card2: Card = None):
         """Initialize a new Hand.
         
         cards holds a list of all the cards in the hand. By default a Hand is
-        created with no cards in it. options holds a list of valid blackjack
-        moved based on the cards in this hand. The flags bust, bj, and soft
+        created with no cards in it. options holds the valid blackjack moves
+        based on the cards in this hand as a combination of the STAND, HIT,
+        DOUBLE and SPLIT bit flags. The total and flags are kept up to date as
+        each card is added so they never need to be recalculated from the
+        whole Hand. The flags bust, bj, and soft
         indicate whether the Hand has a total over 21, exactly 21 with 2 cards,
         or an ace that is being counted with a value of 11 respectively. The
         double multiplier indicates whether this hand is worth double the bet 
         or not.
         
         Keyword arguments:
-        card1   --  The first card in the Hand. Cards should be a list of
-                    strings in the form [rank, suit]. (None default)
+        card1   --  The first card in the Hand. Cards should be one of the
+                    shared Card objects from card.CARDS. (None default)
         card2   --  The second card in the Hand. (None default)
         """
         self.total = 0
@@ -25,39 +38,40 @@ class Hand:
         self.bj = False
         self.soft = False
         self.double = 1
-        self.options = []
+        self.options = 0
         self.cards = []
         if card1 and card2:
-            if (
-                    card1[0] not in Hand.RANKS or
-                    card1[1] not in Hand.SUITS or
-                    card2[0] not in Hand.RANKS or 
-                    card2[1] not in Hand.SUITS
-            ):
+            if not isinstance(card1, Card) or not isinstance(card2, Card):
                 print('Invalid format.', end=' ')
-                print('Cards must be in the format [rank, suit]')
+                print('Cards must be Card objects')
                 print('New hand created with no cards')
             else:
-                self.cards = [card1, card2]
+                self.add_card(card1)
+                self.add_card(card2)
         elif card1 or card2:
             print('Only allowed to create a hand with 2 cards or no cards')
             print('New hand created with no cards')
-        self.set_options()
         
     def calculate_total(self) -> None:
-        """Calculate the total of this Hand and trip the appropriate flags."""
+        """Calculate the total of this Hand from scratch and trip the 
+        appropriate flags.
+        
+        add_card keeps the total up to date on its own, so this is only
+        needed when cards are removed from the Hand.
+        """
         total = 0
+        self.bust = False
+        self.bj = False
+        self.soft = False
         for card in self.cards:
-            if card[0] == 'A':
+            if card.value == 11:
                 if total+11 > 21:
                     total += 1
                 else:
                     total += 11
                     self.soft = True
-            elif card[0] in Hand.TENS:
-                total += 10
             else:
-                total += int(card[0])
+                total += card.value
             if total == 21 and len(self.cards) == 2:
                 self.bj = True
                 self.soft = False
@@ -69,16 +83,33 @@ class Hand:
                     self.bust = True
         self.total = total
         
-    def add_card(self, card: list[str]) -> None:
-        """Add a card to this Hand. Recalculate the available options.
+    def add_card(self, card: Card) -> None:
+        """Add a card to this Hand. Update the total and available options.
         
         Keyword arguments:
-        card    --  The card to be added to the hand. Card should be a list of
-                    strings in the form [rank, suit].
+        card    --  The Card to be added to the hand.
         """
-        if (card[0] not in Hand.RANKS) or (card[1] not in Hand.SUITS):
-            print('Invalid format. Cards must be in the format [rank, suit]')
-        self.cards.append(card)
+        cards = self.cards
+        cards.append(card)
+        total = self.total
+        if card.value == 11:
+            if total+11 > 21:
+                total += 1
+            else:
+                total += 11
+                self.soft = True
+        else:
+            total += card.value
+        if total == 21 and len(cards) == 2:
+            self.bj = True
+            self.soft = False
+        elif total > 21:
+            if self.soft:
+                total -= 10
+                self.soft = False
+            else:
+                self.bust = True
+        self.total = total
         self.set_options()
                 
     def discard(self, index: int = -1) -> None:
@@ -90,29 +121,25 @@ class Hand:
         """
         if self.cards:
             self.cards.pop(index)
+            self.calculate_total()
             self.set_options()
         else:
             print('Cannot discard from an empty hand')
             
     def set_options(self) -> None:
-        """Populate valid options based on the current cards in the Hand."""
-        self.calculate_total()
-        self.options = []
-        if self.total < 21 and self.bust == False:
-            self.options.append('s')
-            self.options.append('stand')
-            self.options.append('h')
-            self.options.append('hit')
+        """Populate valid options based on the current total of the Hand."""
+        if self.total < 21 and not self.bust:
             if len(self.cards) == 2:
-                self.options.append('d')
-                self.options.append('double')
-                if(
-                        self.cards[0][0] == self.cards[1][0] or
-                        (self.cards[0][0] in Hand.TENS and 
-                        self.cards[1][0] in Hand.TENS)
-                ):
-                    self.options.append('p')
-                    self.options.append('split')
+                if self.cards[0].value == self.cards[1].value:
+                    self.options = (
+                            Hand.STAND | Hand.HIT | Hand.DOUBLE | Hand.SPLIT
+                    )
+                else:
+                    self.options = Hand.STAND | Hand.HIT | Hand.DOUBLE
+            else:
+                self.options = Hand.STAND | Hand.HIT
+        else:
+            self.options = 0
     
     def str_card(self, index: int = 0):
         """Return a String representing a specific card in this Hand. 
@@ -126,19 +153,26 @@ class Hand:
         if index >= len(self.cards):
             message += 'X'
         else:
-            message += f'{self.cards[index][0]}{self.cards[index][1]}'
+            message += self.cards[index].name
         return message
         
-    def str_options(self) -> str:
-        """Return a user friendly string of valid options for this Hand."""
+    def str_options(self, options: int | None = None) -> str:
+        """Return a user friendly string of valid options for this Hand.
+
+        Keyword arguments:
+        options --  The option flags to show. If None is provided, the
+                    Hand's own options are shown. (None default)
+        """
+        if options is None:
+            options = self.options
         message = ''
-        if 's' in self.options:
+        if options & Hand.STAND:
             message += '(S)tand'
-        if 'h' in self.options:
+        if options & Hand.HIT:
             message += ' (H)it'
-        if 'd' in self.options:
+        if options & Hand.DOUBLE:
             message += ' (D)ouble'
-        if 'p' in self.options:
+        if options & Hand.SPLIT:
             message += ' S(p)lit'
         return message
         
@@ -146,7 +180,7 @@ class Hand:
         """Return a string including cards, total, and flags for this Hand."""
         message = ''
         for card in self.cards:
-            message += card[0] + card[1] + ' '
+            message += card.name + ' '
         message += f' Total: {self.total}'
         if self.bust:
             message += ' (BUST)'
@@ -158,9 +192,9 @@ class Hand:
 
 
 if __name__ == '__main__':
-    myHand = Hand(['A', 'H'], ['A', 'S'])
+    myHand = Hand(Card.get('A', 'H'), Card.get('A', 'S'))
     print(myHand)
-    myHand.add_card(['10', 'C'])
+    myHand.add_card(Card.get('10', 'C'))
     print(myHand.options)
     print(myHand.str_options())
     print(myHand)
@@ -0,0 +1,256 @@
+"""Run simulations for a Blackjack game across several processes.
+
+Each worker process gets its own copy of the game, including every Player
+and Strategy, reseeds and shuffles its own Shoe, or takes its own part of
+the file of a shoefile.ReplayShoe, and plays its share
+of the rounds with a Simulator. The per-player statistics from every worker
+are then merged back into the Players of the original game as if the
+chunks had been played one after another.
+
+Every worker starts from the same bank, so the banks of the chunks cannot
+follow on from each other. Workers instead play with an unlimited bank:
+bets are never cut down to the bank, doubles and splits are always
+affordable and no one rebuys during the run. Parallel runs therefore do
+not model bank limits. The net winnings of the chunks are added up and
+the bank is then re-derived from them, rebuying into debt if it ends up
+below the minimum bet. Given a tracking.RoundTracker
+for each Player, every worker also tracks its rounds and the trackers are
+merged in chunk order.
+"""
+import copy
+import hashlib
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from checkpoint import (check_checkpoint, fingerprint, load_checkpoint,
+        restore, save_checkpoint)
+from shoefile import ReplayShoe
+from simulator import Simulator, uses_chart
+from tracking import RoundTracker
+
+#The bank every Player plays with in a worker, large enough to never run
+#out and small enough to keep cents exact.
+UNLIMITED_BANK = 1e12
+
+
+def spawn_seeds(seed: int, count: int) -> list[int]:
+    """Derive count independent 64-bit child seeds from one parent seed.
+
+    Each child seed is a hash of the parent seed and the child's position,
+    so the same parent seed always gives the same children and no child's
+    random stream overlaps another's in any predictable way.
+
+    Keyword arguments:
+    seed    --  The parent seed.
+    count   --  The number of child seeds to create.
+    """
+    seeds = []
+    for i in range(count):
+        digest = hashlib.sha256(f'{seed}:{i}'.encode()).digest()
+        seeds.append(int.from_bytes(digest[:8], 'little'))
+    return seeds
+
+
+def _run_chunk(
+        game, rounds: int, seed: int, settings: list[tuple] | None = None,
+        index: int = 0, chunks: int = 1
+) -> tuple[list[tuple], list[RoundTracker] | None]:
+    """Play rounds on a copy of the game and return each Player's results
+    and trackers.
+
+    This runs in a worker process, with every Player's bank replaced by
+    UNLIMITED_BANK. The results for each Player are the change to their
+    winnings, the number of hands won and lost, the longest win and lose
+    streaks and the highest and lowest winnings reached, relative to their
+    winnings at the start of the chunk. settings
+    holds the accuracy and longest streak of a RoundTracker for each
+    Player, or is None to play without trackers.
+
+    The Shoe is reseeded with seed. A ReplayShoe cannot be reseeded, so it
+    deals part index of chunks parts of its file instead.
+    """
+    if isinstance(game.shoe, ReplayShoe):
+        game.shoe.partition(index, chunks)
+    else:
+        game.shoe.rng = random.Random(seed)
+        game.shoe.shuffle()
+    start = []
+    for player in game.players:
+        start.append((player.winnings, player.strat.winTotal,
+                player.strat.loseTotal))
+        player.debt = UNLIMITED_BANK - player.winnings
+        player.bank = UNLIMITED_BANK
+        player.maxWinnings = player.winnings
+        player.minWinnings = player.winnings
+        player.strat.winStreak, player.strat.loseStreak = 0, 0
+    if settings is None:
+        trackers = None
+        Simulator(game).run(rounds)
+    else:
+        trackers = [
+                RoundTracker(player, accuracy, maxStreak)
+                for player, (accuracy, maxStreak) in zip(game.players,
+                        settings)
+        ]
+        for record in Simulator(game).iter_rounds(rounds):
+            trackers[record.player].update()
+        for tracker in trackers:
+            tracker.finish()
+            tracker.close()
+    results = []
+    for player, (winnings, wins, loses) in zip(game.players, start):
+        results.append((
+                player.winnings - winnings,
+                player.strat.winTotal - wins,
+                player.strat.loseTotal - loses,
+                player.strat.maxWins,
+                player.strat.maxLoses,
+                player.maxWinnings - winnings,
+                player.minWinnings - winnings
+        ))
+    return results, trackers
+
+
+def merge_results(players: list, chunks: list[list[tuple]]) -> None:
+    """Merge the results of each chunk into the given Players.
+
+    Chunks are applied in order, so the highest and lowest winnings are
+    found as if the chunks had been played one after another with an
+    unlimited bank. Streaks cannot carry over from one chunk to the next.
+    The net winnings are added to each Player's bank, and a bank left below
+    minBet is topped up with a single rebuy of the smallest multiple of
+    100 that covers minBet, adding to their debt as Player.rebuy does. The
+    bet is then cut down to the bank.
+
+    Keyword arguments:
+    players --  The Players to update.
+    chunks  --  A list of results from _run_chunk, one for each chunk.
+    """
+    for i, player in enumerate(players):
+        strat = player.strat
+        for chunk in chunks:
+            net, wins, loses, maxWins, maxLoses, high, low = chunk[i]
+            winnings = player.winnings
+            if winnings + high > player.maxWinnings:
+                player.maxWinnings = winnings + high
+            if winnings + low < player.minWinnings:
+                player.minWinnings = winnings + low
+            player.bank += net
+            strat.winTotal += wins
+            strat.loseTotal += loses
+            if maxWins > strat.maxWins:
+                strat.maxWins = maxWins
+            if maxLoses > strat.maxLoses:
+                strat.maxLoses = maxLoses
+        if player.bank < player.minBet:
+            player.rebuy(100 * math.ceil((player.minBet - player.bank) / 100))
+        if player.bet > player.bank:
+            player.bet = player.bank
+
+
+def simulate_parallel(
+        game, rounds: int = 100, workers: int | None = None,
+        seed: int | None = None, chunks: int | None = None,
+        checkpoint: str | None = None, interval: float = 300.0,
+        trackers: list[RoundTracker] | None = None
+) -> None:
+    """Split rounds across a pool of processes and merge the results.
+
+    The bets and Strategy positions of the game's Players are left as they
+    were before the simulation, except that a bet is cut down to the bank.
+    Only their banks, debts and statistics are updated. Workers play with an
+    unlimited bank, so bank limits are not modelled; see merge_results.
+    Workers play by the chart, so a game with a Player who has a provider
+    raises a ValueError.
+
+    With a checkpoint file, the results of finished chunks are saved as
+    they come in, at most every interval seconds. An interrupted run given
+    the same file only plays the chunks that had not finished and merges
+    exactly the same results as an uninterrupted run. A checkpoint of a
+    different game or set of Players raises a ValueError.
+
+    Keyword arguments:
+    game    --  The Blackjack game to simulate.
+    rounds  --  The total number of rounds to play. (100 default)
+    workers --  The number of processes to use. If None is provided, one
+                process is used per CPU. (None default)
+    seed    --  The parent seed passed to spawn_seeds to give each worker
+                its own seed. If None is provided, the parent seed is drawn
+                from the game's shoe, so a seeded game still gives the same
+                results every time. (None default)
+    chunks  --  The number of pieces to split the rounds into. More chunks
+                than workers means less work is lost to an interruption.
+                If None is provided, there is one chunk per worker.
+                (None default)
+    checkpoint
+            --  A file to save finished chunks to, or None for no
+                checkpoints. The file is removed once the results are
+                merged. (None default)
+    interval
+            --  The least number of seconds between checkpoints.
+                (300.0 default)
+    trackers
+            --  A RoundTracker for each Player in game.players, in the
+                same order, to merge the trackers of every chunk into. They
+                are finished and closed, as by tracking.track_rounds.
+                (None default)
+    """
+    if not uses_chart(game):
+        raise ValueError(
+                'Players with providers cannot be played in parallel.'
+        )
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, rounds))
+    engine = 'parallel' if trackers is None else 'parallel tracked'
+    settings = None if trackers is None else [
+            (tracker.bankroll.accuracy, tracker.streaks.maxLength)
+            for tracker in trackers
+    ]
+    key = fingerprint(game, engine)
+    state = load_checkpoint(checkpoint) if checkpoint else None
+    if state is not None:
+        check_checkpoint(checkpoint, state, rounds, game, engine)
+        restore(game, state['game'])
+        seed, chunks, results = state['seed'], state['chunks'], state['results']
+    else:
+        if seed is None:
+            seed = game.shoe.rng.getrandbits(64)
+        chunks = max(1, min(chunks or workers, rounds))
+        results = {}
+    seeds = spawn_seeds(seed, chunks)
+    sizes = [rounds // chunks] * chunks
+    for i in range(rounds % chunks):
+        sizes[i] += 1
+    saved = copy.deepcopy(game) if checkpoint else None
+    last = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+                pool.submit(_run_chunk, game, sizes[i], seeds[i],
+                        settings, i, chunks): i
+                for i in range(chunks) if i not in results
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if (
+                    checkpoint and len(results) < chunks and
+                    time.monotonic() - last >= interval
+            ):
+                save_checkpoint(checkpoint, {
+                        'rounds': rounds, 'seed': seed, 'chunks': chunks,
+                        'results': results, 'fingerprint': key,
+                        'game': saved
+                })
+                last = time.monotonic()
+    merge_results(game.players, [results[i][0] for i in range(chunks)])
+    if trackers is not None:
+        for i in range(chunks):
+            for tracker, chunkTracker in zip(trackers, results[i][1]):
+                tracker.merge(chunkTracker)
+        for tracker in trackers:
+            tracker.close()
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
@@ -1,4 +1,4 @@
-from strategy import Strategy
+from strategy import CountStrategy, Strategy
 from hand import Hand
 
 import textwrap
@@ -8,7 +8,7 @@ class Player:
     
     def __init__(
             self, name: str = 'Player', bet: float = 10.0, bank: float = 100.0,
-            minBet: int = 10, strat: Strategy = None
+            minBet: int = 10, strat: Strategy = None, provider=None
     ):
         """Initialize a new Player with one empty Hand.
         
@@ -27,6 +27,10 @@ class Player:
         strat   --  The betting Strategy for the player. If None is provided,
                     the strategy is set to keep the bet the same after either a
                     win or a loss with a maxBet of 1000. (None default)
+        provider--  The providers.ActionProvider that chooses this Player's
+                    moves. If None is provided, the game decides: basic
+                    strategy when simulating and prompts in play_round.
+                    (None default)
         """
         self.name = str(name)
         self.bank = float(bank)
@@ -36,6 +40,7 @@ class Player:
         self.minBet = minBet
         self.maxWinnings = 0
         self.minWinnings = 0
+        self.provider = provider
         if strat:
             self.strat = strat
         else:
@@ -108,6 +113,16 @@ class Player:
         if self.bank < self.bet:
             self.bet = self.bank
         
+    def place_bet(self) -> None:
+        """Size the bet for the next round from a CountStrategy.
+        
+        Called before every round is dealt, so the bet follows the count
+        even after a push, which does not call win or lose. Bets from other
+        Strategies only change with a win or a loss.
+        """
+        if isinstance(self.strat, CountStrategy):
+            self.bet = min(self.minBet * self.strat.bet(), self.bank)
+        
     def rebuy(self, amount: float = 100.0):
         """Increase the Player's bank and debt.
         
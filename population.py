@@ -0,0 +1,184 @@
+"""Replay a recorded stream of results for a whole population of bettors.
+
+sweep.replay plays a stream from sweep.record_units for one Player at a
+time. replay_population does the same for every Strategy in a population at
+once with NumPy: each result in the stream is applied to every bettor's
+bank, bet, Strategy position and statistics in a handful of array
+operations. It follows Player.win, Player.lose, Player.rebuy and
+Strategy.win and Strategy.lose step for step, including bet clamping and
+rebuys, so it gives exactly the same numbers as replay.
+
+Bets are looked up in the compiled tables of each Strategy (see
+Strategy.compile), concatenated into one flat array. Strategies that cannot
+be compiled, those with a negative increment, are replayed one at a time
+with sweep.replay instead.
+"""
+import numpy as np
+
+from sweep import record_units, replay
+from strategy import Strategy
+
+#The statistics returned by replay_population, one array of each.
+FIELDS = (
+        'bank', 'debt', 'bet', 'winnings', 'maxWinnings', 'minWinnings',
+        'winTotal', 'loseTotal', 'maxWins', 'maxLoses'
+)
+
+
+def _tables(strategies: list[Strategy]) -> dict:
+    """Concatenate the compiled bet tables of a population.
+
+    For both the win and lose tables this returns the flat array of bets
+    and, for each Strategy, the offset of its table, the offset of the end
+    of its table and the offset to go back to once the end is reached.
+    """
+    tables = {}
+    for name in ('win', 'lose'):
+        bets, offsets, ends, loops = [], [], [], []
+        for strat in strategies:
+            table = getattr(strat, name + 'Bets')
+            offsets.append(len(bets))
+            loops.append(len(bets) + getattr(strat, name + 'Loop'))
+            bets.extend(table)
+            ends.append(len(bets))
+        tables[name] = (
+                np.array(bets), np.array(offsets), np.array(ends),
+                np.array(loops)
+        )
+    return tables
+
+
+def replay_population(
+        units, strategies: list[Strategy], bet: float = 10.0,
+        bank: float = 100.0, minBet: int = 10, rebuy: float = 100.0
+) -> dict:
+    """Replay a stream for every Strategy and return their final statistics.
+
+    Returns a dict holding an array for each name in FIELDS, with one
+    element per Strategy in the same order.
+
+    Keyword arguments:
+    units       --  A stream of results from sweep.record_units.
+    strategies  --  The Strategies to replay. New Strategies should be
+                    given, they are used but not updated.
+    bet         --  Every bettor's first bet. (10.0 default)
+    bank        --  Every bettor's starting bank. (100.0 default)
+    minBet      --  The table minimum. (10 default)
+    rebuy       --  The amount added by Player.rebuy. (100.0 default)
+    """
+    units = np.asarray(units, dtype=float)
+    count = len(strategies)
+    stats = {
+            'bank': np.full(count, float(bank)),
+            'debt': np.full(count, float(bank)),
+            'bet': np.full(count, float(bet)),
+            'maxWinnings': np.zeros(count),
+            'minWinnings': np.zeros(count),
+            'winTotal': np.zeros(count, dtype=np.int64),
+            'loseTotal': np.zeros(count, dtype=np.int64),
+            'maxWins': np.zeros(count, dtype=np.int64),
+            'maxLoses': np.zeros(count, dtype=np.int64)
+    }
+    compiled = [i for i, s in enumerate(strategies) if s.winBets is not None]
+    if compiled:
+        _replay_compiled(units, [strategies[i] for i in compiled], stats,
+                np.array(compiled), bet, bank, minBet, rebuy)
+    for i, strat in enumerate(strategies):
+        if strat.winBets is None:
+            player = replay(units, strat, bet, bank, minBet, rebuy)
+            for name, value in (
+                    ('bank', player.bank), ('debt', player.debt),
+                    ('bet', player.bet), ('maxWinnings', player.maxWinnings),
+                    ('minWinnings', player.minWinnings),
+                    ('winTotal', strat.winTotal),
+                    ('loseTotal', strat.loseTotal),
+                    ('maxWins', strat.maxWins), ('maxLoses', strat.maxLoses)
+            ):
+                stats[name][i] = value
+    stats['winnings'] = stats['bank'] - stats['debt']
+    return stats
+
+
+def _replay_compiled(
+        units: np.ndarray, strategies: list[Strategy], stats: dict,
+        where: np.ndarray, bet: float, bank: float, minBet: int,
+        rebuy: float
+) -> None:
+    """Replay a stream for compiled Strategies and store the results in
+    stats at the positions in where.
+    """
+    count = len(strategies)
+    tables = _tables(strategies)
+    winBets, winStart, winEnd, winLoop = tables['win']
+    loseBets, loseStart, loseEnd, loseLoop = tables['lose']
+    winIndex, loseIndex = winStart.copy(), loseStart.copy()
+    resets = np.array([s.resetSequences for s in strategies])
+    banks = np.full(count, float(bank))
+    debts = banks.copy()
+    bets = np.full(count, float(bet))
+    high, low = np.zeros(count), np.zeros(count)
+    winTotal = np.zeros(count, dtype=np.int64)
+    loseTotal = winTotal.copy()
+    winStreak, loseStreak = winTotal.copy(), winTotal.copy()
+    maxWins, maxLoses = winTotal.copy(), winTotal.copy()
+    for amount in units.tolist():
+        if amount == 2.0 or amount == -2.0:
+            #A double the bank cannot cover counts as a single bet.
+            stake = bets * np.where(banks < 2*bets, 1.0, 2.0)
+        else:
+            stake = bets * abs(amount)
+        if amount > 0:
+            banks += stake
+            winTotal += 1
+            loseStreak[:] = 0
+            winStreak += 1
+            np.maximum(maxWins, winStreak, out=maxWins)
+            loseIndex[resets] = loseStart[resets]
+            bets = minBet * winBets[winIndex]
+            winIndex += 1
+            done = winIndex == winEnd
+            winIndex[done] = winLoop[done]
+            np.maximum(high, banks - debts, out=high)
+        else:
+            banks -= stake
+            loseTotal += 1
+            winStreak[:] = 0
+            loseStreak += 1
+            np.maximum(maxLoses, loseStreak, out=maxLoses)
+            winIndex[resets] = winStart[resets]
+            bets = minBet * loseBets[loseIndex]
+            loseIndex += 1
+            done = loseIndex == loseEnd
+            loseIndex[done] = loseLoop[done]
+            np.minimum(low, banks - debts, out=low)
+        broke = (banks < minBet) & (banks + rebuy >= minBet)
+        if broke.any():
+            banks[broke] += rebuy
+            debts[broke] += rebuy
+        np.minimum(bets, banks, out=bets)
+    for name, value in (
+            ('bank', banks), ('debt', debts), ('bet', bets),
+            ('maxWinnings', high), ('minWinnings', low),
+            ('winTotal', winTotal), ('loseTotal', loseTotal),
+            ('maxWins', maxWins), ('maxLoses', maxLoses)
+    ):
+        stats[name][where] = value
+
+
+if __name__ == '__main__':
+    import time
+    from itertools import product
+    grid = list(product(
+            [1, 1.5, 2, 3], [0, 0.5, 1, 2, '*1.5', '*2'], [1, 1.5, 2, 3],
+            [0, 0.5, 1, 2, '*1.5', '*2'], [100, 200, 500, 1000]
+    ))
+    myUnits = record_units(20000, seed=1)
+    start = time.perf_counter()
+    myStats = replay_population(myUnits, [Strategy(*args) for args in grid])
+    elapsed = time.perf_counter() - start
+    print(f'Replayed {len(myUnits)} results for {len(grid)} strategies in '
+            f'{elapsed:.2f}s')
+    best = np.argsort(myStats['winnings'])[::-1][:5]
+    for i in best:
+        print(f'{str(grid[i]):<32}{myStats["winnings"][i]:>12.1f}'
+                f'{myStats["minWinnings"][i]:>12.1f}')
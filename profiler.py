@@ -0,0 +1,116 @@
+"""Opt-in timing and event counters for simulated rounds.
+
+Profiling is turned on by passing a Profiler to Blackjack.simulate_rounds,
+Blackjack.play_rounds or a Simulator. Both engines time each phase of a
+round and count events into it as they play. Without a Profiler they only
+check a flag a few times a round.
+"""
+import json
+
+
+class Profiler:
+    """This class collects the time spent in each phase of a round and
+    counts of events such as cards dealt, splits, doubles and shuffles.
+    """
+
+    def __init__(self) -> None:
+        """Create a Profiler with no phases or counters recorded."""
+        self.phases = {}
+        self.counters = {}
+
+    def add(self, phase: str, seconds: float, calls: int = 1) -> None:
+        """Record time spent in a phase.
+
+        Keyword arguments:
+        phase   --  The name of the phase, such as 'play_hand'.
+        seconds --  The time spent.
+        calls   --  The number of calls the time covers. (1 default)
+        """
+        totals = self.phases.get(phase)
+        if totals is None:
+            self.phases[phase] = [calls, seconds]
+        else:
+            totals[0] += calls
+            totals[1] += seconds
+
+    def count(self, event: str, amount: int = 1) -> None:
+        """Add amount to the counter for an event."""
+        self.counters[event] = self.counters.get(event, 0) + amount
+
+    def merge(self, other: 'Profiler') -> None:
+        """Add every phase and counter of another Profiler to this one."""
+        for phase, (calls, seconds) in other.phases.items():
+            self.add(phase, seconds, calls)
+        for event, amount in other.counters.items():
+            self.count(event, amount)
+
+    def reset(self) -> None:
+        """Forget every phase and counter recorded so far."""
+        self.phases = {}
+        self.counters = {}
+
+    def snapshot(self) -> dict:
+        """Return the phases and counters recorded so far as a dict."""
+        phases = {}
+        for phase, (calls, seconds) in self.phases.items():
+            phases[phase] = {
+                    'calls': calls,
+                    'seconds': seconds,
+                    'mean': seconds / calls if calls else 0.0
+            }
+        return {'phases': phases, 'counters': dict(self.counters)}
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """Return snapshot() as a JSON string."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def __str__(self) -> str:
+        """Return a table of the phases followed by the counters."""
+        lines = []
+        total = sum(seconds for calls, seconds in self.phases.values())
+        for phase, (calls, seconds) in self.phases.items():
+            share = seconds / total if total else 0.0
+            lines.append(
+                    f'{phase:<18}{calls:>12,} calls {seconds:>10.3f}s '
+                    f'{share:>6.1%}'
+            )
+        for event, amount in self.counters.items():
+            lines.append(f'{event:<18}{amount:>12,}')
+        return '\n'.join(lines)
+
+
+def count_round(
+        profiler: Profiler, hands: list, dealerBlackjack: bool,
+        cardsDealt: int
+) -> None:
+    """Count the events of one round.
+
+    Keyword arguments:
+    profiler        --  The Profiler to count them in.
+    hands           --  A list for each Player of a (total, bj, double)
+                        tuple for each of their Hands.
+    dealerBlackjack --  Whether the dealer had blackjack.
+    cardsDealt      --  The number of cards dealt in the round.
+    """
+    count = profiler.count
+    count('rounds')
+    count('cardsDealt', cardsDealt)
+    if dealerBlackjack:
+        count('dealerBlackjacks')
+    for playerHands in hands:
+        count('hands', len(playerHands))
+        count('splits', len(playerHands) - 1)
+        for total, bj, double in playerHands:
+            if double == 2:
+                count('doubles')
+            if bj:
+                count('blackjacks')
+
+
+if __name__ == '__main__':
+    from blackjack import Blackjack
+    myGame = Blackjack(numberOfPlayers=3, seed=1)
+    for engine in ('classic', 'fast'):
+        myProfiler = Profiler()
+        myGame.simulate_rounds(20000, engine=engine, profiler=myProfiler)
+        print(f'{engine}:\n{myProfiler}\n')
@@ -0,0 +1,132 @@
+"""Providers that choose the moves for each Player's Hands.
+
+Blackjack.play_hand is the one place Hands are played, whether a person is
+typing in moves or a whole table is being simulated. It asks an
+ActionProvider for every move, and Blackjack.check_ins asks one whether to
+take insurance. ChartProvider plays basic strategy from the game's
+DecisionTable, HumanProvider prompts with input() and ScriptedProvider
+plays a fixed list of moves, for bots and tests. Any other object with the
+same two methods can be given to Blackjack.add_player or
+Blackjack.play_round.
+"""
+from typing import Iterable, Protocol
+
+from chart import Action
+from hand import Hand
+
+
+class ActionProvider(Protocol):
+    """The methods every provider has."""
+
+    def choose(self, game, player, hand: Hand, options: int) -> Action:
+        """Return the move for a Hand.
+
+        options are the Hand's moves the Player can afford, as Hand bit
+        flags. HIT, DOUBLE_STAND, DOUBLE_HIT and SPLIT may only be
+        returned when their flag is in options, and Blackjack.play_hand
+        raises a ValueError for any that is not. options can be 0, as for
+        split aces, and then the only move is STAND.
+        """
+
+    def insurance(self, game, player) -> bool:
+        """Return True if the Player takes insurance."""
+
+
+class ChartProvider:
+    """This class plays basic strategy from the game's DecisionTable and
+    never takes insurance.
+    """
+
+    def choose(self, game, player, hand: Hand, options: int) -> Action:
+        """Return the chart move for a Hand.
+
+        A double that is not in options becomes the stand or hit the chart
+        gives with it, and a hit that is not in options becomes a stand.
+        """
+        upCardIndex = game.dealer.hands[0].cards[0].value - 2
+        if (
+                options & Hand.SPLIT and
+                game.table.split(hand.cards[0].value, upCardIndex)
+        ):
+            return Action.SPLIT
+        move = game.table.lookup(hand.total, hand.soft, upCardIndex)
+        if move >= Action.DOUBLE_STAND and not options & Hand.DOUBLE:
+            move = Action(move - 2)
+        if move == Action.HIT and not options & Hand.HIT:
+            move = Action.STAND
+        return move
+
+    def insurance(self, game, player) -> bool:
+        return False
+
+
+class HumanProvider:
+    """This class asks a person for every move."""
+    MOVES = {
+            Hand.STAND: Action.STAND,
+            Hand.HIT: Action.HIT,
+            Hand.DOUBLE: Action.DOUBLE_STAND,
+            Hand.SPLIT: Action.SPLIT
+    }
+    CHOICES = {'y', 'yes', 'n', 'no'}
+
+    def __init__(self, prompt=input) -> None:
+        """Keyword arguments:
+        prompt  --  The function that shows a prompt and returns the
+                    response. (input default)
+        """
+        self.prompt = prompt
+
+    def choose(self, game, player, hand: Hand, options: int) -> Action:
+        """Prompt until one of the Hand's options is entered, or stand if
+        there are none.
+        """
+        if not options:
+            return Action.STAND
+        while True:
+            response = self.prompt(f'{hand.str_options(options)}? ')
+            flag = Hand.ACTIONS.get(response.lower(), 0) & options
+            if flag:
+                return HumanProvider.MOVES[flag]
+            print('Invalid action')
+
+    def insurance(self, game, player) -> bool:
+        """Prompt until yes or no is entered."""
+        while True:
+            response = self.prompt(
+                    f'{player.name} ${player.bank}: ' +
+                    'Do you want to take insurance?'
+            ).lower()
+            if response in HumanProvider.CHOICES:
+                return response in {'y', 'yes'}
+            print('Please respond with (Y)es or (N)o')
+
+
+class ScriptedProvider:
+    """This class plays a fixed sequence of moves, then basic strategy."""
+    CODES = {'s': Action.STAND, 'h': Action.HIT, 'd': Action.DOUBLE_STAND,
+            'p': Action.SPLIT}
+
+    def __init__(
+            self, moves: Iterable[Action | str] = (),
+            insure: bool = False
+    ) -> None:
+        """Keyword arguments:
+        moves   --  The moves to play in order, as Actions or as 's', 'h',
+                    'd' and 'p'. Once they run out the chart is used.
+                    (() default)
+        insure  --  Whether to take insurance. (False default)
+        """
+        self.moves = iter(moves)
+        self.insure = insure
+        self.chart = ChartProvider()
+
+    def choose(self, game, player, hand: Hand, options: int) -> Action:
+        """Return the next scripted move."""
+        move = next(self.moves, None)
+        if move is None:
+            return self.chart.choose(game, player, hand, options)
+        return ScriptedProvider.CODES.get(move, move)
+
+    def insurance(self, game, player) -> bool:
+        return self.insure
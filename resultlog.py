@@ -0,0 +1,167 @@
+"""A compact binary log of simulated rounds, stored one file per column.
+
+A log is a directory holding one file for each column in COLUMNS. Every
+file is a flat array of fixed-width little-endian values, one per
+RoundRecord, so a single column can be memory-mapped straight into NumPy
+without reading or parsing the rest of the log.
+
+Round numbers from iter_rounds start at 0 on every call, so a ResultLog
+numbers the rounds of each iterable it writes after the last round already
+in the log. Round numbers stay unique when a log is appended to.
+"""
+import os
+import sys
+from array import array
+
+import numpy as np
+
+#The name, array typecode and NumPy dtype of each column in a log.
+COLUMNS = (
+        ('round', 'Q', '<u8'),
+        ('player', 'B', '<u1'),
+        ('bet', 'd', '<f8'),
+        ('double', 'B', '<u1'),
+        ('splits', 'B', '<u1'),
+        ('outcome', 'B', '<u1'),
+        ('net', 'd', '<f8'),
+        ('bank', 'd', '<f8'),
+        ('depth', 'H', '<u2')
+)
+#The number of records held in memory before they are written out.
+BUFFER_SIZE = 1 << 16
+
+
+class ResultLog:
+    """This class writes RoundRecords to a columnar log in bulk.
+
+    Records are collected in one array.array per column and appended to the
+    column files every BUFFER_SIZE records. Use it as a context manager so
+    the last records are written when it is closed:
+        with ResultLog('results') as log:
+            log.write(game.iter_rounds(10**8))
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        """Open a log, creating its directory if needed.
+
+        Keyword arguments:
+        path    --  The directory to store the column files in.
+        append  --  When True new records are added to the end of an
+                    existing log, numbered after its last round. Otherwise
+                    any existing log in the directory is replaced.
+                    (False default)
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        #The number added to the round of each record, and the number the
+        #next iterable given to write starts from.
+        self.offset = 0
+        self.nextRound = last_round(path) + 1 if append else 0
+        mode = 'ab' if append else 'wb'
+        self.files = [
+                open(os.path.join(path, name), mode)
+                for name, typecode, dtype in COLUMNS
+        ]
+        self.buffers = [array(typecode) for name, typecode, dtype in COLUMNS]
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def append(self, record) -> None:
+        """Add one RoundRecord to the log, with offset added to its round."""
+        buffers = self.buffers
+        number = record[0] + self.offset
+        buffers[0].append(number)
+        for i in range(1, len(buffers)):
+            buffers[i].append(record[i])
+        if number >= self.nextRound:
+            self.nextRound = number + 1
+        self.count += 1
+        if self.count % BUFFER_SIZE == 0:
+            self.flush()
+
+    def write(self, records) -> None:
+        """Add every RoundRecord from an iterable, such as iter_rounds.
+
+        The rounds are numbered from the one after the last round written.
+        """
+        self.offset = self.nextRound
+        append = self.append
+        for record in records:
+            append(record)
+
+    def flush(self) -> None:
+        """Write any buffered records to the column files."""
+        for i, buffer in enumerate(self.buffers):
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+            buffer.tofile(self.files[i])
+            self.files[i].flush()
+            self.buffers[i] = array(buffer.typecode)
+
+    def close(self) -> None:
+        """Write any buffered records and close the column files."""
+        self.flush()
+        for file in self.files:
+            file.close()
+
+
+def last_round(path: str) -> int:
+    """Return the last round number in a log, or -1 if it has none."""
+    filename = os.path.join(path, COLUMNS[0][0])
+    if not os.path.exists(filename):
+        return -1
+    rounds = array(COLUMNS[0][1])
+    with open(filename, 'rb') as file:
+        size = os.path.getsize(filename) // rounds.itemsize
+        if not size:
+            return -1
+        file.seek((size - 1) * rounds.itemsize)
+        rounds.fromfile(file, 1)
+    if sys.byteorder == 'big':
+        rounds.byteswap()
+    return rounds[0]
+
+
+def read_column(path: str, name: str):
+    """Return one column of a log as a read-only NumPy memmap.
+
+    No data is copied: the array reads directly from the column file.
+
+    Keyword arguments:
+    path    --  The directory of the log.
+    name    --  The name of a column in COLUMNS.
+    """
+    for column, typecode, dtype in COLUMNS:
+        if column == name:
+            break
+    else:
+        raise ValueError(f'{name} is not a column of a ResultLog.')
+    filename = os.path.join(path, name)
+    if not os.path.getsize(filename):
+        return np.empty(0, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode='r')
+
+
+def read_log(path: str) -> dict:
+    """Return a dict of every column of a log, as given by read_column."""
+    return {name: read_column(path, name) for name, typecode, dtype in COLUMNS}
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+    from blackjack import Blackjack
+    myGame = Blackjack(seed=1)
+    path = os.path.join(tempfile.gettempdir(), 'blackjack-results')
+    start = time.perf_counter()
+    with ResultLog(path) as myLog:
+        myLog.write(myGame.iter_rounds(100000))
+    elapsed = time.perf_counter() - start
+    net = read_column(path, 'net')
+    print(f'Logged {len(net)} rounds in {elapsed:.2f}s to {path}')
+    print(f'Total net: {net.sum():+.2f}')
@@ -0,0 +1,208 @@
+"""Sample whole rounds from their distribution instead of dealing cards.
+
+For studying betting systems only the results of each round matter, not
+the cards. outcome_distribution plays a seeded game once and counts how
+often each round outcome happens, where an outcome is the tuple of units
+won or lost by each Player.win and Player.lose call in the round: () for a
+push, (1.0,) for a win, (-2.0,) for a lost double, (1.5,) for a blackjack,
+(1.0, -1.0) for a split that won one hand and lost the other, and so on.
+An OutcomeSampler then draws rounds from that distribution in constant
+time with Vose's alias method and feeds them to Players, or builds streams
+for population.replay_population.
+"""
+import contextlib
+import io
+import random
+
+import numpy as np
+
+from blackjack import Blackjack
+from simulator import Simulator
+from sweep import RecordingPlayer
+
+
+class AliasTable:
+    """This class samples indexes from a discrete distribution in constant
+    time using Vose's alias method.
+    """
+
+    def __init__(self, weights: list[float]) -> None:
+        """Build the table.
+
+        Keyword arguments:
+        weights --  The relative weight of each index. They do not need to
+                    add up to 1.
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        if not count or total <= 0:
+            raise ValueError('Weights must contain a positive value.')
+        scaled = [w * count / total for w in weights]
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        #Anything left over is 1 up to rounding error.
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        """Return a random index using one random number."""
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        if u - i < self.prob[i]:
+            return i
+        return self.alias[i]
+
+    def sample_array(self, count: int, rng):
+        """Return a NumPy array of count random indexes.
+
+        Keyword arguments:
+        count   --  The number of indexes to draw.
+        rng     --  A numpy.random.Generator.
+        """
+        prob = np.asarray(self.prob)
+        alias = np.asarray(self.alias)
+        u = rng.random(count) * len(prob)
+        i = u.astype(np.int64)
+        return np.where(u - i < prob[i], i, alias[i])
+
+
+def outcome_distribution(
+        rounds: int = 1000000, seed: int | None = None,
+        numberOfDecks: int = 6, table=Blackjack.TABLE
+) -> dict[tuple, float]:
+    """Play rounds and return the probability of each round outcome.
+
+    The distribution is empirical: it is measured from rounds played by a
+    single player betting one unit with a bank that always covers doubles
+    and splits, as in sweep.record_units.
+
+    Keyword arguments:
+    rounds          --  The number of rounds to measure. (1000000 default)
+    seed            --  The seed for the game's shoe. (None default)
+    numberOfDecks   --  The number of Decks in the shoe. (6 default)
+    table           --  The DecisionTable to play by.
+                        (Blackjack.TABLE default)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Blackjack(numberOfDecks, 0, 1, seed=seed)
+    game.table = table
+    recorder = RecordingPlayer()
+    game.players.append(recorder)
+    units = recorder.units
+    counts = {}
+    for record in Simulator(game).iter_rounds(rounds):
+        outcome = tuple(units)
+        counts[outcome] = counts.get(outcome, 0) + 1
+        del units[:]
+    return {outcome: count / rounds for outcome, count in counts.items()}
+
+
+class OutcomeSampler:
+    """This class draws round outcomes from a distribution."""
+
+    def __init__(
+            self, distribution: dict[tuple, float], seed: int | None = None
+    ) -> None:
+        """Build an alias table for the distribution.
+
+        Keyword arguments:
+        distribution    --  A dict of outcome tuples to their probabilities,
+                            as returned by outcome_distribution.
+        seed            --  The seed for the random.Random instance used by
+                            sample and play. (None default)
+        """
+        self.outcomes = list(distribution)
+        self.table = AliasTable(list(distribution.values()))
+        self.rng = random.Random(seed)
+
+    def sample(self) -> tuple:
+        """Return one random round outcome."""
+        return self.outcomes[self.table.sample(self.rng)]
+
+    def play(self, players: list, rounds: int = 100) -> None:
+        """Play rounds for each Player by sampling an outcome for each.
+
+        Each Player gets their own outcome every round. Bets, clamping and
+        rebuys go through Player.win and Player.lose, and a double the
+        bank cannot cover counts as a single bet, as in sweep.replay.
+
+        Keyword arguments:
+        players --  The Players to update.
+        rounds  --  The number of rounds to play. (100 default)
+        """
+        outcomes = self.outcomes
+        sample = self.table.sample
+        rng = self.rng
+        for r in range(rounds):
+            for player in players:
+                for amount in outcomes[sample(rng)]:
+                    if (
+                            (amount == 2.0 or amount == -2.0) and
+                            player.bank < 2*player.bet
+                    ):
+                        amount /= 2
+                    if amount > 0:
+                        player.win(player.bet * amount)
+                    else:
+                        player.lose(player.bet * -amount)
+
+    def units(self, rounds: int, seed: int | None = None):
+        """Return a NumPy stream of units for rounds sampled rounds.
+
+        The stream has the same format as sweep.record_units, so it can be
+        passed to sweep.replay or population.replay_population.
+
+        Keyword arguments:
+        rounds  --  The number of rounds to sample.
+        seed    --  The seed for the numpy.random.Generator. (None default)
+        """
+        rng = np.random.default_rng(seed)
+        lengths = np.array([len(outcome) for outcome in self.outcomes])
+        flat = np.array(
+                [amount for outcome in self.outcomes for amount in outcome]
+        )
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        drawn = self.table.sample_array(rounds, rng)
+        drawnLengths = lengths[drawn]
+        #Position of every unit of every drawn outcome in flat.
+        total = int(drawnLengths.sum())
+        first = np.repeat(starts[drawn], drawnLengths)
+        offset = np.arange(total) - np.repeat(
+                np.cumsum(drawnLengths) - drawnLengths, drawnLengths
+        )
+        return flat[first + offset]
+
+
+if __name__ == '__main__':
+    import time
+    from player import Player
+    from strategy import Strategy
+    myDistribution = outcome_distribution(200000, seed=1)
+    for outcome, p in sorted(
+            myDistribution.items(), key=lambda item: -item[1]
+    )[:8]:
+        print(f'{str(outcome):<16}{p:.4f}')
+    edge = sum(sum(outcome) * p for outcome, p in myDistribution.items())
+    print(f'{len(myDistribution)} outcomes, expected {edge:+.4f} units/round')
+    mySampler = OutcomeSampler(myDistribution, seed=1)
+    myPlayer = Player(bank=1000, strat=Strategy(2, 1, 1, 0, 500))
+    start = time.perf_counter()
+    mySampler.play([myPlayer], 1000000)
+    elapsed = time.perf_counter() - start
+    print(f'Played 1000000 sampled rounds in {elapsed:.2f}s: {myPlayer}')
+    start = time.perf_counter()
+    myUnits = mySampler.units(10000000, seed=1)
+    elapsed = time.perf_counter() - start
+    print(f'Sampled 10000000 rounds into {len(myUnits)} results in '
+            f'{elapsed:.2f}s, mean {myUnits.sum() / 10000000:+.4f}')
@@ -0,0 +1,217 @@
+"""Monte Carlo of many independent playing sessions and their risk of ruin.
+
+A Player plays one endless session and rebuys whenever their bank falls
+below the minimum bet. simulate_sessions instead plays many separate
+sessions, each starting from the same bank and ending at the first of:
+ruin (the bank can no longer cover the minimum bet), a stop-loss, a win
+goal or a maximum number of hands. Round outcomes are drawn from a
+distribution measured by sampling.outcome_distribution, and all of the
+sessions in a batch are played together with NumPy, following Player.win,
+Player.lose and the compiled tables of a Strategy as
+population.replay_population does. A double the bank cannot cover counts as
+a single bet.
+"""
+from enum import IntEnum
+from typing import NamedTuple
+
+import numpy as np
+
+from sampling import AliasTable
+from strategy import Strategy
+
+
+class End(IntEnum):
+    """Why a session ended."""
+    RUIN = 0
+    STOP_LOSS = 1
+    WIN_GOAL = 2
+    MAX_HANDS = 3
+
+
+RUIN, STOP_LOSS, WIN_GOAL, MAX_HANDS = End
+
+#The quantiles reported by summarize.
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class SessionResults(NamedTuple):
+    """The final bank, number of hands and End of every session."""
+    bank: np.ndarray
+    hands: np.ndarray
+    end: np.ndarray
+
+
+def simulate_sessions(
+        distribution: dict[tuple, float], sessions: int = 100000,
+        bank: float = 1000.0, stopLoss: float | None = None,
+        winGoal: float | None = None, maxHands: int = 1000,
+        strat: Strategy | None = None, bet: float = 10.0,
+        minBet: int = 10, seed: int | None = None, batch: int = 100000
+) -> SessionResults:
+    """Play independent sessions and return how each one ended.
+
+    Keyword arguments:
+    distribution    --  A dict of round outcomes to their probabilities, as
+                        returned by sampling.outcome_distribution.
+    sessions        --  The number of sessions. (100000 default)
+    bank            --  The bank each session starts with. (1000.0 default)
+    stopLoss        --  End a session once this much has been lost. None
+                        plays until ruin. (None default)
+    winGoal         --  End a session once this much has been won. None has
+                        no goal. (None default)
+    maxHands        --  The most rounds in a session. (1000 default)
+    strat           --  The betting Strategy. It must be compilable, that is
+                        have no negative increment, and is not updated. If
+                        None, the default Strategy of a Player is used and
+                        every bet after the first is minBet. (None default)
+    bet             --  The first bet of each session. (10.0 default)
+    minBet          --  The table minimum. (10 default)
+    seed            --  The seed for the numpy.random.Generator.
+                        (None default)
+    batch           --  The number of sessions played at once. (100000
+                        default)
+    """
+    if strat is None:
+        strat = Strategy(1, 0, 1, 0, 1000)
+    if strat.winBets is None:
+        raise ValueError(
+                'Strategies with a negative increment cannot be vectorized.'
+        )
+    outcomes = list(distribution)
+    table = AliasTable(list(distribution.values()))
+    width = max(len(outcome) for outcome in outcomes)
+    amounts = np.zeros((len(outcomes), max(width, 1)))
+    for i, outcome in enumerate(outcomes):
+        amounts[i, :len(outcome)] = outcome
+    rng = np.random.default_rng(seed)
+    results = SessionResults(
+            np.empty(sessions), np.empty(sessions, dtype=np.int64),
+            np.empty(sessions, dtype=np.int8)
+    )
+    for start in range(0, sessions, batch):
+        _play_batch(
+                results, start, min(batch, sessions - start), table, amounts,
+                strat, float(bank), stopLoss, winGoal, maxHands, float(bet),
+                minBet, rng
+        )
+    return results
+
+
+def _play_batch(
+        results: SessionResults, start: int, count: int, table: AliasTable,
+        amounts: np.ndarray, strat: Strategy, bank: float,
+        stopLoss: float | None, winGoal: float | None, maxHands: int,
+        bet: float, minBet: int, rng: np.random.Generator
+) -> None:
+    """Play count sessions and store their results from position start.
+
+    Only the sessions still being played are kept in the working arrays;
+    each one is written to results as soon as it ends.
+    """
+    winBets = np.array(strat.winBets)
+    loseBets = np.array(strat.loseBets)
+    winEnd, loseEnd = len(winBets), len(loseBets)
+    resets = strat.resetSequences
+    ids = np.arange(start, start + count)
+    banks = np.full(count, bank)
+    bets = np.full(count, bet)
+    winIndex = np.zeros(count, dtype=np.int64)
+    loseIndex = np.zeros(count, dtype=np.int64)
+    floor = -np.inf if stopLoss is None else bank - stopLoss
+    goal = np.inf if winGoal is None else bank + winGoal
+    for hand in range(1, maxHands + 1):
+        drawn = table.sample_array(len(ids), rng)
+        for k in range(amounts.shape[1]):
+            amount = amounts[drawn, k]
+            won = np.flatnonzero(amount > 0)
+            lost = np.flatnonzero(amount < 0)
+            if not (len(won) or len(lost)):
+                break
+            size = np.abs(amount)
+            #A double the bank cannot cover counts as a single bet.
+            size[(size == 2.0) & (banks < 2*bets)] = 1.0
+            stake = bets * size
+            banks[won] += stake[won]
+            banks[lost] -= stake[lost]
+            if resets:
+                loseIndex[won] = 0
+                winIndex[lost] = 0
+            bets[won] = minBet * winBets[winIndex[won]]
+            bets[lost] = minBet * loseBets[loseIndex[lost]]
+            winIndex[won] += 1
+            loseIndex[lost] += 1
+            winIndex[winIndex == winEnd] = strat.winLoop
+            loseIndex[loseIndex == loseEnd] = strat.loseLoop
+            np.minimum(bets, banks, out=bets)
+        end = np.full(len(ids), -1, dtype=np.int8)
+        end[banks >= goal] = WIN_GOAL
+        end[banks <= floor] = STOP_LOSS
+        end[banks < minBet] = RUIN
+        done = end >= 0
+        if done.any():
+            results.bank[ids[done]] = banks[done]
+            results.hands[ids[done]] = hand
+            results.end[ids[done]] = end[done]
+            playing = ~done
+            ids, banks, bets = ids[playing], banks[playing], bets[playing]
+            winIndex, loseIndex = winIndex[playing], loseIndex[playing]
+            if not len(ids):
+                return
+    results.bank[ids] = banks
+    results.hands[ids] = maxHands
+    results.end[ids] = MAX_HANDS
+
+
+def summarize(results: SessionResults, bank: float = 1000.0) -> dict:
+    """Return the risk of ruin and other statistics of a set of sessions.
+
+    The dict holds the fraction of sessions ending each way, keyed by the
+    lower case End name, 'riskOfRuin' (the same as 'ruin'), the mean net
+    result, and the QUANTILES of session length and final bank as dicts of
+    quantile to value.
+
+    Keyword arguments:
+    results --  The SessionResults from simulate_sessions.
+    bank    --  The bank each session started with. (1000.0 default)
+    """
+    summary = {
+            end.name.lower(): float(np.mean(results.end == end))
+            for end in End
+    }
+    summary['riskOfRuin'] = summary['ruin']
+    summary['meanNet'] = float(results.bank.mean() - bank)
+    summary['hands'] = dict(zip(QUANTILES,
+            np.quantile(results.hands, QUANTILES).tolist()))
+    summary['bank'] = dict(zip(QUANTILES,
+            np.quantile(results.bank, QUANTILES).tolist()))
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """Return a summary from summarize as a printable report."""
+    lines = [
+            f'Risk of ruin: {summary["riskOfRuin"]:.2%}',
+            f'Stop-loss: {summary["stop_loss"]:.2%}  '
+            f'Win goal: {summary["win_goal"]:.2%}  '
+            f'Max hands: {summary["max_hands"]:.2%}',
+            f'Mean net: {summary["meanNet"]:+.2f}',
+            f'{"Quantile":<10}{"Hands":>10}{"Bank":>12}'
+    ]
+    for q in QUANTILES:
+        lines.append(f'{q:<10.0%}{summary["hands"][q]:>10.0f}'
+                f'{summary["bank"][q]:>12.2f}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import time
+    from sampling import outcome_distribution
+    myDistribution = outcome_distribution(200000, seed=1)
+    start = time.perf_counter()
+    myResults = simulate_sessions(
+            myDistribution, 1000000, bank=500, stopLoss=300, winGoal=200,
+            maxHands=500, strat=Strategy(2, 1, 1, 0, 500), seed=1
+    )
+    elapsed = time.perf_counter() - start
+    print(f'Played 1000000 sessions in {elapsed:.2f}s')
+    print(format_summary(summarize(myResults, 500)))
@@ -1,5 +1,7 @@
 import random
 
+from card import Card, CARDS
+from counting import HI_LO, compile_tags
 from deck import Deck
 
 class Shoe(Deck):
@@ -7,49 +9,205 @@ class Shoe(Deck):
     cards and inherits from Deck.
     """
     
-    def __init__(self, decks: int = 6):
+    def __init__(
+            self, decks: int = 6, rng: random.Random | None = None,
+            tags: dict = HI_LO
+    ):
         """Create a shoe containing the specified number of Decks.
         
         A random value between 52 and 104, the size of one to two decks, is
-        chosen upon initialization and stored as cutCard. Once the remaining
+        chosen upon initialization and stored as cutCard. Shoes of fewer than
+        three decks use a value between a half and three quarters of the shoe
+        instead, so the cut card is always reached. Once the remaining
         number of cards in the shoe reaches the cutCard value, the shuffleFlag
         is set to True. This flag indicates that the shoe should be shuffled.
         The shoe is not shuffled immediately when this flag is tripped to allow
-        the current hand to be completed first.
+        the current hand to be completed first. If the shoe still runs out
+        in the middle of a round, the cards dealt in earlier rounds are
+        shuffled and dealt from, as a dealer would, and the whole shoe is
+        shuffled once the round is over. See start_round and
+        reshuffle_discards.
+        
+        All randomness comes from rng, so two Shoes created with generators
+        seeded the same way deal exactly the same cards.
+        
+        The cards list is allocated once and never shrinks. Cards are dealt
+        from the end of the list by moving cursor down, so cards[:cursor]
+        are the cards that have not been dealt yet. Shuffling resets cursor
+        and shuffles the same list in place.
+        
+        The shoe also keeps a running count with a card counting tag system
+        and the number of cards of each rank left. Engines like Simulator
+        move cursor without calling deal, so the cards dealt since the
+        last question are counted when the count is next asked for. This
+        costs nothing until a count is needed and then a single step per
+        card dealt. Note that the dealer's hole card is counted as soon as
+        it is dealt.
+        
+        Keyword arguments:
+        decks   --  The number of Decks in the shoe. (6 default)
+        rng     --  The random.Random instance used to place the cut card and
+                    shuffle. If None is provided, a new unseeded instance is
+                    created. (None default)
+        tags    --  The tag system used for the running count, a dict of each
+                    rank to its tag. See counting.py. (HI_LO default)
         """
         self.numberOfDecks = decks
-        self.cutCard = random.randint(52, 104)
+        self.rng = rng if rng is not None else random.Random()
+        self.newShoe = CARDS * decks
+        self.cutCard = self.place_cut_card()
         self.shuffleFlag = False
-        self.cards = []
-        for i in range(decks):
-            for suit in Deck.SUITS:
-                for rank in Deck.RANKS:
-                    self.cards.append([rank, suit])
+        self.cards = list(self.newShoe)
+        self.cursor = len(self.cards)
+        self.roundStart = self.cursor
+        self.set_tags(tags)
     
     def shuffle(self) -> None:
-        """Shuffle all cards back into the shoe."""
-        self.__init__(self.numberOfDecks)
-        random.shuffle(self.cards)
+        """Shuffle all cards back into the shoe and place a new cut card.
+        
+        The cards are put back in new deck order before shuffling so a
+        seeded shoe always deals the same cards.
+        """
+        self.cutCard = self.place_cut_card()
+        self.shuffleFlag = False
+        self.cards[:] = self.newShoe
+        self.cursor = len(self.cards)
+        self.roundStart = self.cursor
+        self.rng.shuffle(self.cards)
+        self._reset_count()
+        
+    def place_cut_card(self) -> int:
+        """Return a random number of cards to leave behind the cut card."""
+        size = len(self.newShoe)
+        if size < 156:
+            return self.rng.randint(size // 2, size * 3 // 4)
+        return self.rng.randint(52, 104)
+        
+    def shuffle_remaining(self) -> None:
+        """Shuffle only the cards that have not been dealt already."""
+        remaining = self.cards[:self.cursor]
+        self.rng.shuffle(remaining)
+        self.cards[:self.cursor] = remaining
     
-    def deal(self) -> list[str]:
-        """Remove the last card in the deck and return it."""
-        if len(self.cards) == self.cutCard:
+    def start_round(self, cards: int) -> None:
+        """Get ready to deal a round that needs at least cards cards.
+        
+        The shoe is shuffled first if fewer cards than that are left. Every
+        card dealt before the round becomes a discard for
+        reshuffle_discards.
+        """
+        if self.cursor < cards:
+            self.shuffle()
+        self.roundStart = self.cursor
+        
+    def reshuffle_discards(self) -> None:
+        """Shuffle the discards from earlier rounds and deal on from them.
+        
+        This is done by deal when the shoe runs out in the middle of a
+        round. The cards in play stay dealt and shuffleFlag is set so the
+        whole shoe is shuffled after the round. Raises an IndexError if
+        there are no discards either.
+        """
+        discards = self.cards[self.roundStart:]
+        if not discards:
+            raise IndexError('Cannot deal from an empty shoe')
+        inPlay = self.cards[self.cursor:self.roundStart]
+        self.rng.shuffle(discards)
+        self.cards[:] = discards + inPlay
+        #Recount so only the cards in play are counted as dealt.
+        self.cursor = len(self.cards)
+        self._reset_count()
+        self.cursor = len(discards)
+        self.roundStart = len(self.cards)
+        self.shuffleFlag = True
+    
+    def deal(self) -> Card:
+        """Deal the next card from the shoe and return it."""
+        if self.cursor == self.cutCard:
             self.shuffleFlag = True
-        return self.cards.pop()
+        if not self.cursor:
+            self.reshuffle_discards()
+        self.cursor -= 1
+        return self.cards[self.cursor]
+        
+    def count(self) -> int:
+        """Return the number of cards left in the shoe."""
+        return self.cursor
+        
+    def set_tags(self, tags: dict) -> None:
+        """Count with a different tag system, recounting the dealt cards."""
+        self.tags = tags
+        self.cardTags = compile_tags(tags)
+        counted = self.cursor
+        self.cursor = len(self.cards)
+        self._reset_count()
+        self.cursor = counted
+        
+    def _reset_count(self) -> None:
+        """Start counting again from a full shoe."""
+        self.runningCount = 0
+        self.rankCounts = [4 * self.numberOfDecks] * 13
+        self.counted = self.cursor
+        
+    def _update_count(self) -> None:
+        """Count the cards dealt since the count was last updated."""
+        cursor = self.cursor
+        if cursor >= self.counted:
+            return
+        cards = self.cards
+        cardTags = self.cardTags
+        rankCounts = self.rankCounts
+        runningCount = self.runningCount
+        for i in range(cursor, self.counted):
+            index = cards[i].index
+            runningCount += cardTags[index]
+            rankCounts[index % 13] -= 1
+        self.runningCount = runningCount
+        self.counted = cursor
+        
+    def running_count(self) -> int:
+        """Return the running count of the cards dealt since the shuffle."""
+        self._update_count()
+        return self.runningCount
+        
+    def true_count(self) -> float:
+        """Return the running count divided by the number of decks left."""
+        self._update_count()
+        if not self.cursor:
+            return float(self.runningCount)
+        return self.runningCount * 52 / self.cursor
+        
+    def remaining(self, rank: str) -> int:
+        """Return the number of cards of a rank that have not been dealt."""
+        self._update_count()
+        return self.rankCounts[Card.RANKS.index(rank)]
+        
+    def rank_counts(self) -> dict[str, int]:
+        """Return the number of cards of each rank that have not been dealt.
+        """
+        self._update_count()
+        return dict(zip(Card.RANKS, self.rankCounts))
+        
+    def reveal(self) -> None:
+        """Print a string list of all cards left in the shoe."""
+        print(' '.join(card.name for card in self.cards[:self.cursor]))
     
     def __str__(self) -> str:
         """Return a string representation of this Shoe."""
         message = f"A {self.numberOfDecks}-deck shoe containing "
-        message += f"{len(self.cards)} cards"
+        message += f"{self.cursor} cards"
         return message
 
 
 if __name__ == '__main__':
-    myShoe = Shoe()
+    myShoe = Shoe(rng=random.Random(1))
     myShoe.shuffle()
     print(f'Shuffled myShoe, {myShoe}')
     print('Dealing 10 cards:')
     for i in range(10):
         print(myShoe.deal())
     print(f'myShoe: {myShoe}')
+    print(f'Running count: {myShoe.running_count()}', end=' ')
+    print(f'True count: {myShoe.true_count():.2f}')
+    print(myShoe.rank_counts())
     
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Running statistics and simulations that stop once their results are
+precise enough.
+
+RunningStats keeps the count, mean and variance of a stream of numbers in
+constant memory with Welford's method, and two of them can be merged.
+run_until plays rounds for a game until the confidence interval on every
+player's expected net winnings per round is narrow enough or a time budget
+runs out, so clear results do not need as many rounds as close ones.
+"""
+import math
+import time
+
+from profiler import Profiler
+from simulator import Simulator, uses_chart
+
+#The z score of each supported confidence level.
+Z_SCORES = {0.9: 1.6448536269514722, 0.95: 1.959963984540054,
+        0.99: 2.5758293035489004}
+#The number of rounds played between checks for convergence.
+CHECK_ROUNDS = 1000
+
+
+class RunningStats:
+    """This class keeps the mean and variance of a stream of numbers."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        """Add one number to the statistics."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Add all of the numbers seen by another RunningStats."""
+        count = self.count + other.count
+        if not other.count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """The sample variance, or 0.0 with fewer than two numbers."""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stderr(self) -> float:
+        """The standard error of the mean, or infinity with fewer than two
+        numbers.
+        """
+        if self.count < 2:
+            return math.inf
+        return math.sqrt(self.variance / self.count)
+
+    def interval(self, confidence: float = 0.95) -> float:
+        """Return the half-width of the confidence interval on the mean.
+
+        Raises a KeyError if confidence is not in Z_SCORES.
+        """
+        return Z_SCORES[confidence] * self.stderr
+
+    def __str__(self) -> str:
+        return (f'{self.mean:+.4f} ± {self.interval():.4f} '
+                f'over {self.count} rounds')
+
+
+def run_until(
+        game, maxRounds: int, precision: float | None = None,
+        timeBudget: float | None = None, confidence: float = 0.95,
+        minRounds: int = CHECK_ROUNDS, engine: str = 'fast',
+        profiler: Profiler | None = None
+) -> tuple[list[RunningStats], int]:
+    """Play rounds until every player's expected net winnings per round is
+    known to within precision, timeBudget seconds have passed or maxRounds
+    rounds have been played.
+
+    Convergence and the time are checked every CHECK_ROUNDS rounds. Returns
+    a RunningStats of the net winnings per round of each Player, in the
+    order of game.players, and the number of rounds played.
+
+    Keyword arguments:
+    game        --  The Blackjack game to simulate.
+    maxRounds   --  The most rounds to play.
+    precision   --  The target half-width, in dollars, of the confidence
+                    interval on each player's mean. None plays until the
+                    time budget or maxRounds. (None default)
+    timeBudget  --  The most seconds to play for. None has no limit.
+                    (None default)
+    confidence  --  The confidence level of the interval, one of Z_SCORES.
+                    (0.95 default)
+    minRounds   --  The fewest rounds to play before stopping early, so the
+                    variance estimate can settle. (CHECK_ROUNDS default)
+    engine      --  'fast' plays with a Simulator unless the game is
+                    displaying hands or a Player has a provider, 'classic'
+                    with Blackjack.play_rounds. ('fast' default)
+    profiler    --  A Profiler for the engine to add the time of each phase
+                    and counts of events to. (None default)
+    """
+    players = game.players
+    stats = [RunningStats() for player in players]
+    deadline = None if timeBudget is None else time.monotonic() + timeBudget
+    fast = engine == 'fast' and not game.display and uses_chart(game)
+    simulator = Simulator(game, profiler) if fast else None
+    done = 0
+    while done < maxRounds:
+        block = min(CHECK_ROUNDS, maxRounds - done)
+        if fast:
+            for record in simulator.iter_rounds(block):
+                stats[record.player].add(record.net)
+        else:
+            for i in range(block):
+                before = [player.winnings for player in players]
+                game.play_rounds(1, profiler)
+                for j, player in enumerate(players):
+                    stats[j].add(player.winnings - before[j])
+        done += block
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if (
+                precision is not None and done >= minRounds and
+                all(s.interval(confidence) <= precision for s in stats)
+        ):
+            break
+    return stats, done
+
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+    from blackjack import Blackjack
+    from strategy import Strategy
+    with contextlib.redirect_stdout(io.StringIO()):
+        myGame = Blackjack(6, 0, seed=1)
+        myGame.add_player(strat=Strategy(1, 0, 1, 0, 1000), bank=1000)
+        myGame.add_player(strat=Strategy(2, 1, 1, 0, 500), bank=1000)
+    myGame.display = False
+    start = time.perf_counter()
+    myStats, myRounds = run_until(myGame, 10**8, precision=0.25)
+    elapsed = time.perf_counter() - start
+    print(f'Converged after {myRounds} rounds in {elapsed:.2f}s')
+    for player, s in zip(myGame.players, myStats):
+        print(f'{player.name}: {s}')
@@ -1,3 +1,7 @@
+import copy
+import math
+
+
 class _betIterator:
     """This class is an iterator used to easily determine the next bet when
     using a progressive betting strategy.
@@ -159,6 +163,12 @@ class Strategy:
     multiple types of winning and losing progressions. It also tracks the
     total number of hands won/lost as well as the longest win/lose streak.
     """
+    #The longest bet table compile will build before falling back to the
+    #iterators.
+    MAX_STEPS = 4096
+    #An object with an add(won, length) method, such as a
+    #tracking.StreakHistogram, told the length of every streak that ends.
+    streaks = None
     def __init__(
             self, initialWin: float, incrementWin: float | str,
             initialLose: float, incrementLose: float | str, maxBet: int
@@ -185,56 +195,130 @@ class Strategy:
         self.winSeq = iter(self.winStrat)
         self.loseStrat = _betIterator(initialLose, incrementLose, maxBet)
         self.loseSeq = iter(self.loseStrat)
+        #A negative increment copies the position of one sequence into the
+        #other and an increment of zero or less restarts the other sequence
+        #on every result.
+        numeric = [
+                i for i in (incrementWin, incrementLose)
+                if type(i) in {float, int}
+        ]
+        self.copySequences = any(i < 0 for i in numeric)
+        self.resetSequences = any(i <= 0 for i in numeric)
+        self.compile()
+
+    def compile(self) -> None:
+        """Precompute the bets of each sequence into lookup tables.
+
+        winBets[k] is the bet returned by the k-th call to next() on the win
+        iterator since it was last restarted, and likewise for loseBets.
+        Every progression either settles on maxBet or repeats, so once the
+        end of a table is reached the position goes back to winLoop or
+        loseLoop. Strategies with a negative increment depend on both
+        sequences at once and cannot be compiled, so their tables are None
+        and the iterators are used instead. Call this again after changing
+        a pattern, increment or the maxBet of either iterator directly.
+        """
+        self.winIndex, self.loseIndex = 0, 0
+        self.winBets, self.winLoop = None, 0
+        self.loseBets, self.loseLoop = None, 0
+        if self.copySequences:
+            return
+        winTable = self._compile_sequence(self.winStrat)
+        loseTable = self._compile_sequence(self.loseStrat)
+        if winTable and loseTable:
+            self.winBets, self.winLoop = winTable
+            self.loseBets, self.loseLoop = loseTable
+
+    @staticmethod
+    def _compile_sequence(
+            strat: _betIterator
+    ) -> tuple[list[float], int] | None:
+        """Return the bets of a _betIterator and where they start repeating.
+
+        The iterator is copied and stepped until its state repeats. None is
+        returned if it has not repeated within MAX_STEPS bets.
+        """
+        seq = iter(copy.copy(strat))
+        bets, seen = [], {}
+        for k in range(Strategy.MAX_STEPS):
+            state = (min(seq.count, len(seq.pattern)), seq.bet)
+            if state in seen:
+                return bets, seen[state]
+            seen[state] = k
+            bets.append(next(seq))
+        return None
+
+    def unroll(self, won: bool, length: int) -> list[float]:
+        """Return the first length bets of the win or lose table, following
+        the loop back once the end of the table is reached.
+
+        This is for engines that look up many bets at once. The Strategy
+        must be compiled, that is winBets must not be None.
+        """
+        if won:
+            bets, loop = self.winBets, self.winLoop
+        else:
+            bets, loop = self.loseBets, self.loseLoop
+        unrolled = bets[:length]
+        while len(unrolled) < length:
+            unrolled.extend(bets[loop:loop + length - len(unrolled)])
+        return unrolled
 
     def win(self) -> float:
-        """Record a win and return the next value in the win iterator."""
+        """Record a win and return the next value in the win sequence."""
         self.winTotal += 1
+        if self.loseStreak and self.streaks is not None:
+            self.streaks.add(False, self.loseStreak)
         self.loseStreak = 0
         self.winStreak += 1
         if self.winStreak > self.maxWins:
             self.maxWins = self.winStreak
-        if (((type(self.incrementWin) in {float, int} and
-                self.incrementWin < 0) or
-                (type(self.incrementLose) in {float, int} and
-                self.incrementLose < 0)) and
-                self.winSeq.count == 0):
+        bets = self.winBets
+        if bets is not None:
+            if self.resetSequences:
+                self.loseIndex = 0
+            i = self.winIndex
+            self.winIndex = i+1 if i+1 < len(bets) else self.winLoop
+            return bets[i]
+        if self.copySequences and self.winSeq.count == 0:
             self.winSeq.set_count(self.loseSeq.count)
             self.winSeq.set_bet(self.loseSeq.bet)
-        if ((type(self.incrementWin) in {float, int} and
-                self.incrementWin <= 0) or
-                (type(self.incrementLose) in {float, int} and
-                self.incrementLose <= 0)):
+        if self.resetSequences:
             self.loseSeq = iter(self.loseStrat)
         return next(self.winSeq)
 
     def lose(self) -> float:
-        """Record a loss and return the next value in the lose iterator."""
+        """Record a loss and return the next value in the lose sequence."""
         self.loseTotal += 1
+        if self.winStreak and self.streaks is not None:
+            self.streaks.add(True, self.winStreak)
         self.winStreak = 0
         self.loseStreak += 1
         if self.loseStreak > self.maxLoses:
             self.maxLoses = self.loseStreak
-        if (((type(self.incrementWin) in {float, int} and
-                self.incrementWin < 0) or
-                (type(self.incrementLose) in {float, int} and
-                self.incrementLose < 0)) and
-                self.loseSeq.count == 0):
+        bets = self.loseBets
+        if bets is not None:
+            if self.resetSequences:
+                self.winIndex = 0
+            i = self.loseIndex
+            self.loseIndex = i+1 if i+1 < len(bets) else self.loseLoop
+            return bets[i]
+        if self.copySequences and self.loseSeq.count == 0:
             self.loseSeq.set_count(self.winSeq.count)
             self.loseSeq.set_bet(self.winSeq.bet)
-        if ((type(self.incrementLose) in {float, int} and
-                self.incrementLose <= 0) or
-                (type(self.incrementWin) in {float, int} and
-                self.incrementWin <= 0)):
+        if self.resetSequences:
             self.winSeq = iter(self.winStrat)
         return next(self.loseSeq)
 
     def add_win(self, step: float | str) -> None:
         """Add a step to the end of the bet pattern for the win iterable."""
         self.winStrat.add_step(step)
+        self.compile()
 
     def add_lose(self, step: float | str) -> None:
         """Add step to the end of the bet pattern for the lose iterable."""
         self.loseStrat.add_step(step)
+        self.compile()
 
     def set_max(self, bet: int) -> None:
         """Set the maximum allowed bet for this Strategy."""
@@ -245,6 +329,7 @@ class Strategy:
             self.winStrat.set_max(bet)
             self.loseStrat.set_max(bet)
             self.maxBet = bet
+            self.compile()
             
     def __str__(self) -> str:
         """Return a string representation of this Strategy."""
@@ -256,6 +341,110 @@ class Strategy:
         return display
 
 
+class CountStrategy:
+    """This class represents a betting strategy that sizes each bet from the
+    true count of a Shoe instead of from wins and losses.
+
+    It has the same interface as Strategy, so Player.win and Player.lose use
+    it in exactly the same way: both record the result and return the next
+    bet as a multiple of the minimum bet. The ramp is compiled into a list
+    indexed by the floored true count, so finding a bet is one clamp and
+    one index.
+    """
+    #Count bets depend on the cards, so they cannot be compiled into win and
+    #lose tables like a Strategy's.
+    winBets = loseBets = None
+    streaks = None
+
+    def __init__(
+            self, ramp: dict[int, float], maxBet: int, shoe=None
+    ) -> None:
+        """Create a CountStrategy.
+
+        Keyword arguments:
+        ramp    --  A dict of true counts to bets, as multiples of the
+                    minimum bet. Counts between the keys use the bet of the
+                    next lower key, counts below the lowest key use its bet
+                    and counts above the highest key use the highest bet.
+                    For example {0: 1, 2: 2, 3: 4, 4: 8} spreads from 1 to
+                    8 units.
+        maxBet  --  The maximum bet allowed for this Strategy, as a multiple
+                    of the minimum bet.
+        shoe    --  The Shoe to read the true count from. Blackjack.add_player
+                    sets this to the game's shoe when it is None. Until then
+                    every bet is the bet for a count of 0. (None default)
+        """
+        if not ramp:
+            raise ValueError('A ramp needs at least one count.')
+        self.winStreak, self.maxWins, self.winTotal = 0, 0, 0
+        self.loseStreak, self.maxLoses, self.loseTotal = 0, 0, 0
+        self.ramp = dict(ramp)
+        self.maxBet = maxBet
+        self.shoe = shoe
+        self.compile()
+
+    def compile(self) -> None:
+        """Build the table of bets from the ramp and maxBet."""
+        self.low = min(self.ramp)
+        self.table = []
+        bet = self.ramp[self.low]
+        for count in range(self.low, max(self.ramp) + 1):
+            bet = self.ramp.get(count, bet)
+            self.table.append(float(min(bet, self.maxBet)))
+        self.last = len(self.table) - 1
+        self.neutral = self.table[min(max(-self.low, 0), self.last)]
+
+    def bet(self) -> float:
+        """Return the bet for the next round.
+
+        If the shoe is about to be reshuffled the next round is played from
+        a new shoe, so the bet for a count of 0 is used.
+        """
+        shoe = self.shoe
+        if shoe is None or shoe.shuffleFlag or shoe.cursor < shoe.cutCard:
+            return self.neutral
+        i = math.floor(shoe.true_count()) - self.low
+        if i < 0:
+            i = 0
+        elif i > self.last:
+            i = self.last
+        return self.table[i]
+
+    def win(self) -> float:
+        """Record a win and return the next bet."""
+        self.winTotal += 1
+        if self.loseStreak and self.streaks is not None:
+            self.streaks.add(False, self.loseStreak)
+        self.loseStreak = 0
+        self.winStreak += 1
+        if self.winStreak > self.maxWins:
+            self.maxWins = self.winStreak
+        return self.bet()
+
+    def lose(self) -> float:
+        """Record a loss and return the next bet."""
+        self.loseTotal += 1
+        if self.winStreak and self.streaks is not None:
+            self.streaks.add(True, self.winStreak)
+        self.winStreak = 0
+        self.loseStreak += 1
+        if self.loseStreak > self.maxLoses:
+            self.maxLoses = self.loseStreak
+        return self.bet()
+
+    def set_max(self, bet: int) -> None:
+        """Set the maximum allowed bet for this Strategy."""
+        if type(bet) != int:
+            print('Max bet must be an integer')
+            return
+        self.maxBet = bet
+        self.compile()
+
+    def __str__(self) -> str:
+        """Return a string representation of this CountStrategy."""
+        return f'ramp: {self.ramp}\nmax: {self.maxBet}'
+
+
 if __name__ == '__main__':
     myStrat = Strategy(2, 2, 1, -1, 1000)
     myStrat.add_win(4)
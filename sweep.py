@@ -0,0 +1,195 @@
+"""Score a grid of betting Strategies against the same dealt cards.
+
+Basic strategy plays a hand the same way whatever the bet, so the cards
+only need to be played once. record_units plays a seeded game with a flat
+one unit bet and records every call to Player.win and Player.lose as a
+signed number of units: 1 for a win, 2 for a doubled win, 1.5 for a
+blackjack and negative numbers for losses. Pushes do not call either and
+are not recorded. replay then feeds that stream to a new Player for each
+Strategy, so every Strategy sees exactly the same results (common random
+numbers) and the differences between them are not hidden by the luck of
+the cards.
+
+The stream is recorded with a bank that always allows doubling and
+splitting. When a Player's bank would not cover a double, replay scores
+that hand as a single bet instead, which keeps the bank from going below
+zero just as the bank checks in a game do. Split hands are always scored
+as played.
+"""
+import contextlib
+import io
+from array import array
+from functools import partial
+from itertools import product
+from typing import NamedTuple
+
+from blackjack import Blackjack
+from parallel import spawn_seeds
+from player import Player
+from strategy import Strategy
+from simulator import Simulator
+
+
+class SweepResult(NamedTuple):
+    """The score of one Strategy, averaged over every recorded stream.
+
+    winnings, maxWinnings and minWinnings are the mean over the streams of
+    the Player values with the same names. maxWins and maxLoses are the
+    longest streaks seen in any stream.
+    """
+    strategy: tuple
+    winnings: float
+    maxWinnings: float
+    minWinnings: float
+    wins: float
+    loses: float
+    maxWins: int
+    maxLoses: int
+
+
+class RecordingPlayer(Player):
+    """A Player betting one unit that records every win and loss."""
+
+    def __init__(self) -> None:
+        super().__init__(bet=1, bank=1e15, minBet=1,
+                strat=Strategy(1, 0, 1, 0, 1))
+        self.units = array('d')
+
+    def win(self, amount: float | None = None) -> None:
+        self.units.append(amount or 1.0)
+
+    def lose(self, amount: float | None = None) -> None:
+        self.units.append(-(amount or 1.0))
+
+
+def record_units(
+        rounds: int, seed: int | None = None, numberOfDecks: int = 6,
+        table=Blackjack.TABLE
+) -> array:
+    """Play rounds for one player betting one unit and return the results.
+
+    Keyword arguments:
+    rounds          --  The number of rounds to play.
+    seed            --  The seed for the game's shoe. (None default)
+    numberOfDecks   --  The number of Decks in the shoe. (6 default)
+    table           --  The DecisionTable to play by.
+                        (Blackjack.TABLE default)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Blackjack(numberOfDecks, 0, 1, seed=seed)
+    game.table = table
+    recorder = RecordingPlayer()
+    game.players.append(recorder)
+    Simulator(game).run(rounds)
+    return recorder.units
+
+
+def replay(
+        units, strat: Strategy, bet: float = 10.0, bank: float = 100.0,
+        minBet: int = 10, rebuy: float = 100.0
+) -> Player:
+    """Play a recorded stream for a new Player and return the Player.
+
+    Bets, clamping to the bank and rebuys are handled by Player.win and
+    Player.lose exactly as they are in a game. A double the bank cannot
+    cover counts as a single bet.
+
+    Keyword arguments:
+    units   --  A stream of results from record_units.
+    strat   --  The Strategy to bet with. It is used as is, so pass a new
+                Strategy for each replay.
+    bet     --  The Player's first bet. (10.0 default)
+    bank    --  The Player's starting bank. (100.0 default)
+    minBet  --  The table minimum. (10 default)
+    rebuy   --  The amount added by Player.rebuy. (100.0 default)
+    """
+    player = Player(bet=bet, bank=bank, minBet=minBet, strat=strat)
+    #Player.win and Player.lose rebuy with the default amount.
+    player.rebuy = partial(Player.rebuy, player, rebuy)
+    win, lose = player.win, player.lose
+    for amount in units:
+        if (amount == 2.0 or amount == -2.0) and player.bank < 2*player.bet:
+            amount /= 2
+        if amount > 0:
+            win(player.bet * amount)
+        else:
+            lose(player.bet * -amount)
+    return player
+
+
+def make_grid(
+        initialWins, incrementWins, initialLoses, incrementLoses, maxBets
+) -> list[tuple]:
+    """Return every combination of the given Strategy arguments."""
+    return list(product(
+            initialWins, incrementWins, initialLoses, incrementLoses, maxBets
+    ))
+
+
+def sweep(
+        grid, rounds: int = 10000, seed: int = 0, streams: int = 1,
+        bet: float = 10.0, bank: float = 100.0, minBet: int = 10,
+        numberOfDecks: int = 6
+) -> list[SweepResult]:
+    """Score every Strategy in a grid and return them ranked by winnings.
+
+    Keyword arguments:
+    grid            --  An iterable of Strategy argument tuples
+                        (initialWin, incrementWin, initialLose,
+                        incrementLose, maxBet), for example from make_grid.
+    rounds          --  The number of rounds in each stream. (10000 default)
+    seed            --  The parent seed of the streams. (0 default)
+    streams         --  The number of independent streams every Strategy is
+                        scored on. (1 default)
+    bet             --  Every Player's first bet. (10.0 default)
+    bank            --  Every Player's starting bank. (100.0 default)
+    minBet          --  The table minimum. (10 default)
+    numberOfDecks   --  The number of Decks in the shoe. (6 default)
+    """
+    recorded = [
+            record_units(rounds, childSeed, numberOfDecks)
+            for childSeed in spawn_seeds(seed, streams)
+    ]
+    results = []
+    for args in grid:
+        totals = [0.0] * 5
+        maxWins, maxLoses = 0, 0
+        for units in recorded:
+            player = replay(units, Strategy(*args), bet, bank, minBet)
+            strat = player.strat
+            for i, value in enumerate((
+                    player.winnings, player.maxWinnings, player.minWinnings,
+                    strat.winTotal, strat.loseTotal
+            )):
+                totals[i] += value
+            maxWins = max(maxWins, strat.maxWins)
+            maxLoses = max(maxLoses, strat.maxLoses)
+        results.append(SweepResult(
+                tuple(args), *(total / streams for total in totals),
+                maxWins, maxLoses
+        ))
+    results.sort(key=lambda result: result.winnings, reverse=True)
+    return results
+
+
+def format_table(results: list[SweepResult], top: int | None = None) -> str:
+    """Return a ranked table of sweep results as a string."""
+    lines = [
+            f'{"rank":>4}  {"strategy":<32}{"winnings":>12}{"max":>12}'
+            f'{"min":>12}{"won":>9}{"lost":>9}{"streaks":>9}'
+    ]
+    for rank, result in enumerate(results[:top], 1):
+        lines.append(
+                f'{rank:>4}  {str(result.strategy):<32}'
+                f'{result.winnings:>12.1f}{result.maxWinnings:>12.1f}'
+                f'{result.minWinnings:>12.1f}{result.wins:>9.0f}'
+                f'{result.loses:>9.0f}'
+                f'{f"{result.maxWins}/{result.maxLoses}":>9}'
+        )
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    myGrid = make_grid([1, 2], [0, 1, '*2'], [1, 2], [0, 1, '*2'], [200])
+    myResults = sweep(myGrid, rounds=20000, seed=1, streams=4)
+    print(format_table(myResults, top=10))
@@ -0,0 +1,30 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blackjack import Blackjack
+
+
+@pytest.fixture
+def make_game():
+    """Return a function that creates a quiet, seeded Blackjack game."""
+    def make(decks=6, players=1, seed=1, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = Blackjack(decks, players, seed=seed, **kwargs)
+        game.display = False
+        return game
+    return make
+
+
+def state(game):
+    """Return everything a round can change for each Player and the shoe."""
+    return (
+            [(p.bank, p.debt, p.bet, p.maxWinnings, p.minWinnings)
+                    for p in game.players],
+            game.shoe.cursor, game.shoe.cutCard
+    )
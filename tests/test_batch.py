@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from batch import BatchSimulator
+from blackjack import Blackjack
+from chart import DecisionTable
+
+
+def test_outcomes_are_seeded():
+    first = BatchSimulator(50, seed=1).run(200)
+    second = BatchSimulator(50, seed=1).run(200)
+    assert first.shape == (200, 50)
+    assert (first == second).all()
+    assert (first*2 == np.round(first*2)).all()
+    assert np.abs(first).max() <= 8
+
+
+def test_edge_matches_basic_strategy():
+    outcomes = BatchSimulator(2000, seed=1).run(500)
+    assert -0.02 < outcomes.mean() < 0.01
+
+
+@pytest.mark.parametrize('soft, total, upCardIndex', [
+        (False, 16, 8),
+        (False, 4, 0),
+        (True, 18, 9),
+])
+def test_missing_chart_entry_raises(soft, total, upCardIndex):
+    chart = {k: list(v) for k, v in Blackjack.CHART.items()}
+    softChart = {k: list(v) for k, v in Blackjack.SOFTCHART.items()}
+    (softChart if soft else chart)[total][upCardIndex] = None
+    table = DecisionTable(chart, softChart, Blackjack.SPLITCHART)
+    with pytest.raises(ValueError, match=f'{total} against'):
+        BatchSimulator(10, table=table)
@@ -0,0 +1,24 @@
+import copy
+import pickle
+
+import pytest
+
+from card import CARDS, Card
+
+
+def test_cards_are_shared():
+    assert len(set(CARDS)) == 52
+    for card in CARDS:
+        assert Card.get(card.rank, card.suit) is card
+        assert CARDS[card.index] is card
+        assert pickle.loads(pickle.dumps(card)) is card
+        assert copy.deepcopy(card) is card
+
+
+def test_card_values():
+    values = {card.rank: card.value for card in CARDS}
+    assert values['A'] == 11
+    assert all(values[rank] == 10 for rank in Card.TENS)
+    assert values['7'] == 7
+    with pytest.raises(ValueError):
+        Card.get('1', 'S')
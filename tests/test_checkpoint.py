@@ -0,0 +1,101 @@
+import pytest
+
+import checkpoint
+import parallel
+from checkpoint import run_checkpointed
+from conftest import state
+from parallel import simulate_parallel
+from strategy import Strategy
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupt_after_save(monkeypatch, module):
+    """Make module stop the run right after its first checkpoint."""
+    save = module.save_checkpoint
+    def save_and_stop(path, saved):
+        save(path, saved)
+        raise Interrupt
+    monkeypatch.setattr(module, 'save_checkpoint', save_and_stop)
+
+
+def make_table(make_game, seed=1):
+    game = make_game(players=0, seed=seed)
+    game.add_player(bank=500, strat=Strategy(2, 1, 1, 0, 500))
+    game.add_player(bank=1000)
+    return game
+
+
+@pytest.mark.parametrize('engine', ['fast', 'classic'])
+def test_resume_matches_uninterrupted(make_game, monkeypatch, tmp_path,
+        engine):
+    monkeypatch.setattr(checkpoint, 'BLOCK_ROUNDS', 500)
+    path = str(tmp_path / 'run.ckpt')
+    whole = make_table(make_game)
+    run_checkpointed(whole, 3000, path, 0.0, engine)
+    with monkeypatch.context() as patch:
+        interrupt_after_save(patch, checkpoint)
+        with pytest.raises(Interrupt):
+            run_checkpointed(make_table(make_game), 3000, path, 0.0, engine)
+    assert checkpoint.load_checkpoint(path)['done'] == 500
+    resumed = make_table(make_game)
+    run_checkpointed(resumed, 3000, path, 0.0, engine)
+    assert state(resumed) == state(whole)
+    assert checkpoint.load_checkpoint(path) is None
+
+
+@pytest.mark.parametrize('rounds, seed, engine', [
+        (4000, 1, 'fast'),
+        (3000, 2, 'fast'),
+        (3000, 1, 'classic'),
+])
+def test_resume_refuses_other_runs(make_game, monkeypatch, tmp_path,
+        rounds, seed, engine):
+    monkeypatch.setattr(checkpoint, 'BLOCK_ROUNDS', 500)
+    path = str(tmp_path / 'run.ckpt')
+    with monkeypatch.context() as patch:
+        interrupt_after_save(patch, checkpoint)
+        with pytest.raises(Interrupt):
+            run_checkpointed(make_table(make_game), 3000, path, 0.0)
+    with pytest.raises(ValueError):
+        run_checkpointed(make_table(make_game, seed), rounds, path, 0.0,
+                engine)
+
+
+def test_resume_refuses_other_players(make_game, monkeypatch, tmp_path):
+    monkeypatch.setattr(checkpoint, 'BLOCK_ROUNDS', 500)
+    path = str(tmp_path / 'run.ckpt')
+    with monkeypatch.context() as patch:
+        interrupt_after_save(patch, checkpoint)
+        with pytest.raises(Interrupt):
+            run_checkpointed(make_table(make_game), 3000, path, 0.0)
+    game = make_table(make_game)
+    game.players[0].strat = Strategy(1, 0, 1, 0, 1000)
+    with pytest.raises(ValueError):
+        run_checkpointed(game, 3000, path, 0.0)
+
+
+def test_parallel_resume_matches_uninterrupted(make_game, monkeypatch,
+        tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    whole = make_table(make_game)
+    simulate_parallel(whole, 2000, 1, chunks=4)
+    with monkeypatch.context() as patch:
+        interrupt_after_save(patch, parallel)
+        with pytest.raises(Interrupt):
+            simulate_parallel(make_table(make_game), 2000, 1, chunks=4,
+                    checkpoint=path, interval=0.0)
+    assert len(checkpoint.load_checkpoint(path)['results']) == 1
+    resumed = make_table(make_game)
+    simulate_parallel(resumed, 2000, 1, chunks=4, checkpoint=path)
+    assert state(resumed) == state(whole)
+    with monkeypatch.context() as patch:
+        interrupt_after_save(patch, parallel)
+        with pytest.raises(Interrupt):
+            simulate_parallel(make_table(make_game), 2000, 1, chunks=4,
+                    checkpoint=path, interval=0.0)
+    with pytest.raises(ValueError):
+        simulate_parallel(make_table(make_game, 2), 2000, 1, chunks=4,
+                checkpoint=path)
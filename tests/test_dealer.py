@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from blackjack import Blackjack
+from card import CARDS
+from chart import Action
+from dealer import (OUTCOMES, cache_clear, composition, dealer_probabilities,
+        expected_values, stand_value)
+
+SHOE = composition(CARDS * 6)
+
+
+@pytest.mark.parametrize('upValue', range(2, 12))
+def test_probabilities_add_up(upValue):
+    probabilities = dealer_probabilities(upValue, SHOE)
+    assert sum(probabilities) == pytest.approx(1.0)
+    hidden = dealer_probabilities(upValue, SHOE, True)
+    assert sum(hidden) == pytest.approx(1.0)
+    assert hidden[OUTCOMES.index('blackjack')] == 0.0
+
+
+def test_probabilities_match_dealing():
+    rng = random.Random(1)
+    cards = list(CARDS)
+    upCard = cards.pop(0)
+    expected = dealer_probabilities(upCard.value, composition(cards))
+    counts = dict.fromkeys(OUTCOMES, 0)
+    trials = 40000
+    for i in range(trials):
+        rng.shuffle(cards)
+        total, soft = upCard.value, True
+        hand = [upCard.value]
+        for card in cards:
+            hand.append(card.value)
+            total = sum(hand)
+            aces = hand.count(11)
+            while total > 21 and aces:
+                total -= 10
+                aces -= 1
+            soft = aces > 0
+            if len(hand) == 2 and total == 21:
+                total = 'blackjack'
+                break
+            if total > 17 or (total == 17 and not soft):
+                break
+        if total != 'blackjack' and total > 21:
+            total = 'bust'
+        counts[total] += 1
+    for outcome, p in zip(OUTCOMES, expected):
+        assert counts[outcome] / trials == pytest.approx(p, abs=0.01)
+
+
+def test_expected_values_agree_with_chart():
+    cache_clear()
+    table = Blackjack.TABLE
+    for total, upValue in ((11, 6), (10, 10), (17, 6), (13, 2)):
+        shoe = list(SHOE)
+        shoe[upValue - 2] -= 1
+        values = expected_values(total, False, upValue, tuple(shoe))
+        best = max(values, key=values.get)
+        move = table.lookup(total, False, upValue - 2)
+        assert best == {Action.STAND: 'stand', Action.HIT: 'hit',
+                Action.DOUBLE_HIT: 'double'}[move]
+    assert stand_value(22, 10, SHOE) == -1.0
+
+
+def test_empty_composition_raises():
+    empty = (0,) * 10
+    tens = (0,) * 8 + (4, 0)
+    with pytest.raises(ValueError, match='no cards'):
+        dealer_probabilities(7, empty)
+    with pytest.raises(ValueError, match='no cards'):
+        dealer_probabilities(11, tens, True)
+    with pytest.raises(ValueError, match='no cards'):
+        stand_value(18, 7, empty)
+    with pytest.raises(ValueError, match='no cards'):
+        expected_values(12, False, 7, empty)
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from card import CARDS, Card
+from hand import Hand
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_hand_totals_match_recalculation(seed):
+    rng = random.Random(seed)
+    hand = Hand()
+    while not hand.bust and len(hand.cards) < 8:
+        hand.add_card(rng.choice(CARDS))
+        recalculated = Hand()
+        recalculated.cards = list(hand.cards)
+        recalculated.calculate_total()
+        assert (hand.total, hand.soft, hand.bj, hand.bust) == (
+                recalculated.total, recalculated.soft, recalculated.bj,
+                recalculated.bust)
+
+
+def test_hand_options():
+    eight = Card.get('8', 'S')
+    pair = Hand(eight, Card.get('8', 'H'))
+    assert pair.options == Hand.STAND | Hand.HIT | Hand.DOUBLE | Hand.SPLIT
+    pair.add_card(Card.get('2', 'C'))
+    assert pair.options == Hand.STAND | Hand.HIT
+    blackjack = Hand(Card.get('A', 'S'), Card.get('K', 'D'))
+    assert blackjack.bj and blackjack.options == 0
+    soft = Hand(Card.get('A', 'S'), Card.get('6', 'D'))
+    assert soft.soft and soft.total == 17
+    soft.add_card(Card.get('9', 'C'))
+    assert not soft.soft and soft.total == 16
@@ -0,0 +1,50 @@
+import copy
+import random
+
+import pytest
+
+from parallel import UNLIMITED_BANK, simulate_parallel, spawn_seeds
+from simulator import Simulator
+from strategy import Strategy
+
+
+def make_table(make_game, bank=100):
+    game = make_game(players=0, seed=1)
+    game.add_player(bank=bank)
+    game.add_player(bank=bank, strat=Strategy(1, 0, 2, '*2', 640))
+    return game
+
+
+def test_spawn_seeds_are_stable_and_distinct():
+    seeds = spawn_seeds(1, 100)
+    assert seeds == spawn_seeds(1, 100)
+    assert seeds[:10] == spawn_seeds(1, 10)
+    assert len(set(seeds + spawn_seeds(2, 100))) == 200
+
+
+def test_one_chunk_plays_with_an_unlimited_bank(make_game):
+    game = make_table(make_game)
+    sequential = copy.deepcopy(game)
+    simulate_parallel(game, 3000, workers=1, seed=5, chunks=1)
+    sequential.shoe.rng = random.Random(spawn_seeds(5, 1)[0])
+    sequential.shoe.shuffle()
+    for player in sequential.players:
+        player.debt, player.bank = UNLIMITED_BANK, UNLIMITED_BANK
+    Simulator(sequential).run(3000)
+    for player, played in zip(game.players, sequential.players):
+        assert player.winnings == played.winnings
+        assert player.maxWinnings == played.maxWinnings
+        assert player.minWinnings == played.minWinnings
+        assert player.strat.winTotal == played.strat.winTotal
+
+
+@pytest.mark.parametrize('workers, chunks', [(4, 4), (2, 7)])
+def test_merged_banks_keep_player_invariants(make_game, workers, chunks):
+    game = make_table(make_game, bank=10)
+    simulate_parallel(game, 20000, workers=workers, seed=1, chunks=chunks)
+    for player in game.players:
+        assert player.bank >= player.minBet > 0
+        assert 0 < player.bet <= player.bank
+        assert player.minWinnings <= player.winnings <= player.maxWinnings
+    #The martingale player loses far more than their bank at some point.
+    assert game.players[1].minWinnings < -10
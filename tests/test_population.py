@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from population import replay_population
+from sweep import record_units, replay
+from strategy import Strategy
+
+ARGS = [(1, 0, 1, 0, 1000), (2, 1, 1, 0, 500), (1, 0, 1, 1, 64),
+        (4, -1, 1, 1, 16), (1, 1, 3, -1, 8)]
+
+
+@pytest.fixture(scope='module')
+def units():
+    return record_units(5000, seed=3)
+
+
+@pytest.mark.parametrize('rebuy', [100.0, 40.0, 250.0])
+def test_population_matches_replay(units, rebuy):
+    stats = replay_population(units, [Strategy(*a) for a in ARGS], 10.0,
+            50.0, 10, rebuy)
+    for i, args in enumerate(ARGS):
+        player = replay(units, Strategy(*args), 10.0, 50.0, 10, rebuy)
+        assert stats['bank'][i] == pytest.approx(player.bank)
+        assert stats['debt'][i] == pytest.approx(player.debt)
+        assert stats['minWinnings'][i] == pytest.approx(player.minWinnings)
+
+
+def test_rebuy_is_used_for_uncompiled_strategies(units):
+    strategies = [Strategy(4, -1, 1, 1, 16)]
+    assert strategies[0].winBets is None
+    low = replay_population(units, strategies, 10.0, 50.0, 10, 40.0)
+    strategies = [Strategy(4, -1, 1, 1, 16)]
+    high = replay_population(units, strategies, 10.0, 50.0, 10, 250.0)
+    assert not np.array_equal(low['debt'], high['debt'])
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from conftest import state
+from profiler import Profiler
+from simulator import Simulator
+
+PHASES = {'deal_round', 'play_hand', 'play_dealer', 'calculate_winners',
+        'shuffle'}
+
+
+def test_engines_count_the_same_events(make_game):
+    fast, classic = Profiler(), Profiler()
+    Simulator(make_game(players=3), fast).run(5000)
+    classic_game = make_game(players=3)
+    classic_game.play_rounds(5000, classic)
+    assert fast.counters == classic.counters
+    assert fast.counters['rounds'] == 5000
+    assert fast.counters['hands'] == 15000 + fast.counters['splits']
+    assert set(fast.phases) == PHASES
+    assert set(classic.phases) == PHASES | {'discard_hands'}
+    assert fast.phases['play_hand'][0] == 15000
+    assert classic.phases['play_hand'][0] == 15000
+
+
+def test_profiling_does_not_change_results(make_game):
+    profiled, plain = make_game(players=2), make_game(players=2)
+    profiled.simulate_rounds(3000, profiler=Profiler())
+    plain.simulate_rounds(3000)
+    assert state(profiled) == state(plain)
+    profiled.simulate_rounds(3000, engine='classic', profiler=Profiler())
+    plain.simulate_rounds(3000, engine='classic')
+    assert state(profiled) == state(plain)
+
+
+def test_snapshot_round_trips_through_json():
+    profiler = Profiler()
+    profiler.add('play_hand', 0.5, 2)
+    profiler.count('splits', 3)
+    other = Profiler()
+    other.add('play_hand', 0.25)
+    profiler.merge(other)
+    snapshot = json.loads(profiler.to_json())
+    assert snapshot['phases']['play_hand'] == {
+            'calls': 3, 'seconds': 0.75, 'mean': 0.25
+    }
+    assert snapshot['counters'] == {'splits': 3}
+
+
+@pytest.mark.parametrize('engine', ['fast', 'classic'])
+@pytest.mark.parametrize('kwargs', [
+        {'precision': 0.0},
+        {'timeBudget': 60.0},
+        {'checkpoint': 'run.ckpt'},
+])
+def test_profiler_with_other_options(make_game, capsys, tmp_path, engine,
+        kwargs):
+    if 'checkpoint' in kwargs:
+        kwargs = {'checkpoint': str(tmp_path / kwargs['checkpoint'])}
+    profiler = Profiler()
+    make_game(players=2).simulate_rounds(2000, engine=engine,
+            profiler=profiler, **kwargs)
+    assert profiler.counters['rounds'] == 2000
+    assert profiler.phases['play_hand'][0] == 4000
+
+
+def test_profiler_with_workers_is_refused(make_game, capsys):
+    with pytest.raises(ValueError):
+        make_game().simulate_rounds(100, workers=2, profiler=Profiler())
@@ -0,0 +1,115 @@
+import pytest
+
+from card import Card
+from conftest import state
+from hand import Hand
+from parallel import simulate_parallel
+from providers import ChartProvider, ScriptedProvider
+from simulator import Simulator, play_split
+from stats import run_until
+from strategy import Strategy
+from tracking import track_rounds
+
+
+def stack(game, ranks):
+    """Make the shoe deal the given ranks next, in order."""
+    cards = [Card.get(rank, 'S') for rank in ranks]
+    shoe = game.shoe
+    shoe.cards[shoe.cursor - len(cards):shoe.cursor] = cards[::-1]
+
+
+def deal(game, ranks, provider, bank=1000):
+    """Deal one Player the first two ranks against a 10 and a 7, then the
+    rest as they are asked for, and play their Hands.
+    """
+    player = game.players[0]
+    player.bank = bank
+    stack(game, [ranks[0], '10', ranks[1], '7'] + list(ranks[2:]))
+    game.deal_round()
+    game.play_hand(player, provider)
+    return player.hands
+
+
+def test_split_aces_get_one_card_each(make_game):
+    hands = deal(make_game(), ['A', 'A', '5', '6', '9', '9'], None)
+    assert [[c.rank for c in hand.cards] for hand in hands] == [
+            ['A', '6'], ['A', '5']
+    ]
+    assert all(hand.options == 0 for hand in hands)
+
+
+def test_split_aces_match_fast_engine(make_game):
+    game = make_game()
+    hands = deal(game, ['A', 'A', '5', '6', '9', '9'], None)
+    cards = iter(Card.get(rank, 'S') for rank in ['5', '6', '9', '9'])
+    results = play_split(
+            Card.get('A', 'S'), Card.get('A', 'S'), 8, True,
+            lambda: next(cards), game.table
+    )
+    assert results == [(h.total, h.bj, h.double) for h in hands]
+
+
+def test_split_aces_can_split_again(make_game):
+    hands = deal(make_game(), ['A', 'A', 'A', '6', '9', '3'], None)
+    assert len(hands) == 3
+    assert all(len(hand.cards) == 2 for hand in hands)
+
+
+@pytest.mark.parametrize('pair, moves, bank', [
+        ('53', ['p'], 1000),
+        ('53', ['h', 'd'], 1000),
+        ('53', ['d'], 15),
+        ('55', ['p'], 15),
+])
+def test_moves_outside_options_are_rejected(make_game, pair, moves, bank):
+    with pytest.raises(ValueError):
+        deal(make_game(), [*pair, '2', '2', '2'], ScriptedProvider(moves),
+                bank)
+
+
+def test_hit_on_split_ace_is_rejected(make_game):
+    with pytest.raises(ValueError):
+        deal(make_game(), ['A', 'A', '5', '6', '9'],
+                ScriptedProvider(['p', 'h']))
+
+
+def test_chart_provider_falls_back(make_game):
+    game = make_game()
+    stack(game, ['6', '10', '5', '7'])
+    game.deal_round()
+    hand = game.players[0].hands[0]
+    assert ChartProvider().choose(game, None, hand, Hand.STAND) == 0
+    assert ChartProvider().choose(game, None, hand, Hand.STAND | Hand.HIT) == 1
+
+
+def provider_game(make_game, provider):
+    game = make_game(players=0)
+    game.add_player(bank=1000, strat=Strategy(2, 1, 1, 0, 500),
+            provider=provider)
+    return game
+
+
+def test_simulators_refuse_providers(make_game):
+    game = provider_game(make_game, ChartProvider())
+    with pytest.raises(ValueError):
+        Simulator(game)
+    with pytest.raises(ValueError):
+        game.iter_rounds(10)
+    with pytest.raises(ValueError):
+        simulate_parallel(game, 100, 2)
+
+
+@pytest.mark.parametrize('run', [
+        lambda game: run_until(game, 2000),
+        lambda game: track_rounds(game, 2000),
+        lambda game: game.simulate_rounds(2000, workers=2),
+])
+def test_providers_play_through_play_hand(make_game, capsys, run):
+    chart = provider_game(make_game, ChartProvider())
+    standing = provider_game(make_game, ScriptedProvider('s' * 10**5))
+    default = provider_game(make_game, None)
+    for game in (chart, standing):
+        run(game)
+    default.play_rounds(2000)
+    assert state(chart) == state(default)
+    assert state(standing) != state(default)
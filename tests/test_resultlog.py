@@ -0,0 +1,31 @@
+import numpy as np
+
+from resultlog import ResultLog, last_round, read_column, read_log
+
+
+def test_log_matches_records(make_game, tmp_path):
+    path = str(tmp_path / 'log')
+    records = list(make_game(players=2).iter_rounds(500))
+    with ResultLog(path) as log:
+        log.write(records)
+    columns = read_log(path)
+    for i, name in enumerate(columns):
+        assert columns[name].tolist() == [record[i] for record in records]
+
+
+def test_append_continues_round_numbers(make_game, tmp_path):
+    path = str(tmp_path / 'log')
+    assert last_round(path) == -1
+    game = make_game(players=2)
+    with ResultLog(path) as log:
+        log.write(game.iter_rounds(300))
+        log.write(game.iter_rounds(200))
+    assert last_round(path) == 499
+    with ResultLog(path, append=True) as log:
+        log.write(game.iter_rounds(100))
+    rounds = read_column(path, 'round')
+    assert len(rounds) == 1200
+    assert (rounds == np.repeat(np.arange(600), 2)).all()
+    with ResultLog(path) as log:
+        log.write(game.iter_rounds(10))
+    assert last_round(path) == 9
@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+import pytest
+
+from player import Player
+from sampling import AliasTable, OutcomeSampler, outcome_distribution
+from strategy import Strategy
+from sweep import replay
+
+WEIGHTS = [[1.0], [1, 1], [5, 0, 3, 2], [0.1, 0.2, 0.3, 0.4, 10, 0, 7],
+        [1e-6, 1, 2, 3, 4, 5]]
+
+
+def implied(table):
+    """Return the exact probability of each index in an AliasTable."""
+    count = len(table.prob)
+    p = [prob / count for prob in table.prob]
+    for i, prob in enumerate(table.prob):
+        if table.alias[i] != i:
+            p[table.alias[i]] += (1 - prob) / count
+    return p
+
+
+@pytest.mark.parametrize('weights', WEIGHTS)
+def test_table_is_exact(weights):
+    total = sum(weights)
+    assert implied(AliasTable(weights)) == pytest.approx(
+            [w / total for w in weights])
+
+
+@pytest.mark.parametrize('weights', [[], [0, 0], [-1, 1]])
+def test_table_rejects_bad_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_samples_follow_weights():
+    weights = [5, 0, 3, 2]
+    table = AliasTable(weights)
+    rng = random.Random(1)
+    counts = np.bincount([table.sample(rng) for i in range(50000)],
+            minlength=4)
+    drawn = np.bincount(table.sample_array(50000, np.random.default_rng(1)),
+            minlength=4)
+    for sampled in (counts, drawn):
+        assert sampled[1] == 0
+        assert sampled / 50000 == pytest.approx([0.5, 0, 0.3, 0.2], abs=0.01)
+
+
+def test_distribution_is_seeded():
+    distribution = outcome_distribution(20000, seed=1)
+    assert distribution == outcome_distribution(20000, seed=1)
+    assert sum(distribution.values()) == pytest.approx(1.0)
+    assert () in distribution and (1.5,) in distribution
+    edge = sum(sum(outcome) * p for outcome, p in distribution.items())
+    assert -0.05 < edge < 0.03
+
+
+def test_play_matches_replay_of_samples():
+    distribution = outcome_distribution(20000, seed=1)
+    player = Player(bank=10**6, strat=Strategy(2, 1, 1, 0, 500))
+    OutcomeSampler(distribution, seed=2).play([player], 5000)
+    sampler = OutcomeSampler(distribution, seed=2)
+    units = [amount for i in range(5000) for amount in sampler.sample()]
+    replayed = replay(units, Strategy(2, 1, 1, 0, 500), bank=10**6)
+    assert (player.bank, player.maxWinnings, player.minWinnings) == (
+            replayed.bank, replayed.maxWinnings, replayed.minWinnings)
+
+
+def test_units_are_drawn_outcomes():
+    distribution = outcome_distribution(20000, seed=1)
+    units = OutcomeSampler(distribution).units(5000, seed=3)
+    assert set(units) <= {a for outcome in distribution for a in outcome}
+    assert len(units) > 4000
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from sessions import (MAX_HANDS, RUIN, STOP_LOSS, WIN_GOAL,
+        simulate_sessions, summarize)
+from strategy import Strategy
+
+#Even money outcomes, with a push and a lost double.
+DISTRIBUTION = {(1.0,): 0.45, (-1.0,): 0.45, (): 0.05, (-2.0,): 0.05}
+
+
+def run(**kwargs):
+    options = dict(sessions=5000, bank=200, stopLoss=150, winGoal=100,
+            maxHands=300, strat=Strategy(2, 1, 1, 0, 100), seed=1)
+    options.update(kwargs)
+    return simulate_sessions(DISTRIBUTION, **options)
+
+
+def test_sessions_are_seeded():
+    first, second = run(), run()
+    for a, b in zip(first, second):
+        assert (a == b).all()
+    assert len(run(batch=700).end) == 5000
+
+
+def test_every_session_ends_for_its_reason():
+    results = run()
+    bank, hands, end = results
+    assert set(np.unique(end)) <= {RUIN, STOP_LOSS, WIN_GOAL, MAX_HANDS}
+    assert (bank[end == RUIN] < 10).all()
+    assert (bank[end == STOP_LOSS] <= 50).all()
+    assert (bank[end == WIN_GOAL] >= 300).all()
+    assert (hands[end == MAX_HANDS] == 300).all()
+    assert (hands[end != MAX_HANDS] <= 300).all()
+    assert (hands >= 1).all()
+
+
+def test_no_limits_plays_to_ruin():
+    results = run(stopLoss=None, winGoal=None, maxHands=10**5, sessions=200,
+            bank=50)
+    assert (results.end == RUIN).all()
+
+
+def test_summary_adds_up():
+    summary = summarize(run(), 200)
+    fractions = [summary[name] for name in ('ruin', 'stop_loss', 'win_goal',
+            'max_hands')]
+    assert sum(fractions) == pytest.approx(1.0)
+    assert summary['riskOfRuin'] == summary['ruin']
+    assert list(summary['hands'].values()) == sorted(summary['hands'].values())
+
+
+def test_negative_increment_is_refused():
+    with pytest.raises(ValueError):
+        run(strat=Strategy(1, -1, 1, 0, 100))
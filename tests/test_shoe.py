@@ -0,0 +1,83 @@
+import random
+from collections import Counter
+
+import pytest
+
+from card import Card
+from counting import HI_LO, SYSTEMS, ZEN, compile_tags
+from shoe import Shoe
+
+
+@pytest.mark.parametrize('decks', range(1, 9))
+def test_cut_card_bounds(decks):
+    shoe = Shoe(decks, random.Random(decks))
+    size = 52 * decks
+    low, high = (size // 2, size * 3 // 4) if size < 156 else (52, 104)
+    for i in range(200):
+        shoe.shuffle()
+        assert low <= shoe.cutCard <= high
+
+
+def test_deal_reshuffles_discards_mid_round():
+    shoe = Shoe(1, random.Random(3))
+    shoe.shuffle()
+    for i in range(40):
+        shoe.deal()
+    shoe.start_round(4)
+    inPlay = [shoe.deal() for i in range(12)]
+    assert shoe.cursor == 0
+    card = shoe.deal()
+    assert shoe.shuffleFlag
+    assert card not in inPlay
+    assert Counter(shoe.cards) == Counter(shoe.newShoe)
+    #Only the cards in play and the card just dealt are counted.
+    dealt = Counter(c.rank for c in inPlay + [card])
+    assert shoe.rank_counts() == {
+            rank: 4 - dealt[rank] for rank in Card.RANKS
+    }
+
+
+def test_deal_raises_without_discards():
+    shoe = Shoe(1, random.Random(3))
+    shoe.shuffle()
+    shoe.start_round(4)
+    for i in range(52):
+        shoe.deal()
+    with pytest.raises(IndexError):
+        shoe.deal()
+
+
+def test_start_round_shuffles_short_shoe():
+    shoe = Shoe(1, random.Random(3))
+    shoe.shuffle()
+    for i in range(45):
+        shoe.deal()
+    shoe.start_round(8)
+    assert shoe.cursor == 52
+
+
+@pytest.mark.parametrize('system', sorted(SYSTEMS))
+def test_running_count_follows_tags(system):
+    tags = SYSTEMS[system]
+    shoe = Shoe(2, random.Random(1), tags)
+    shoe.shuffle()
+    dealt = []
+    for i in range(104):
+        dealt.append(shoe.deal())
+        if i % 7 == 0:
+            assert shoe.running_count() == sum(tags[c.rank] for c in dealt)
+    #Every system is balanced.
+    assert shoe.running_count() == 0
+    shoe.set_tags(HI_LO)
+    assert shoe.running_count() == 0
+
+
+def test_set_tags_recounts_dealt_cards():
+    shoe = Shoe(1, random.Random(2), ZEN)
+    shoe.shuffle()
+    dealt = [shoe.deal() for i in range(20)]
+    shoe.set_tags(HI_LO)
+    assert shoe.running_count() == sum(HI_LO[c.rank] for c in dealt)
+    assert shoe.true_count() == shoe.running_count() * 52 / 32
+    with pytest.raises(ValueError):
+        compile_tags({'A': -1})
@@ -0,0 +1,84 @@
+import copy
+import pickle
+
+import pytest
+
+from conftest import state
+from parallel import _run_chunk
+from shoefile import ReplayShoe, ShoeFile, write_shoes
+
+
+@pytest.fixture(scope='module')
+def path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('shoes') / 'shoes.bin')
+    write_shoes(path, 100, seed=7)
+    return path
+
+
+@pytest.mark.parametrize('engine', ['fast', 'classic'])
+def test_replay_deals_like_seeded_shoe(make_game, capsys, path, engine):
+    seeded = make_game(players=3, seed=7)
+    replayed = make_game(players=3, seed=7)
+    replayed.shoe = pickle.loads(pickle.dumps(ReplayShoe(path)))
+    seeded.simulate_rounds(2000, engine=engine)
+    replayed.simulate_rounds(2000, engine=engine)
+    assert state(seeded) == state(replayed)
+
+
+def test_replay_shoe_loads_file_orderings(path):
+    shoe = ReplayShoe(path, start=3, step=2)
+    cuts, orders = ShoeFile(path).as_arrays()
+    for i in (3, 5, 7):
+        assert [card.index for card in shoe.cards] == orders[i].tolist()
+        assert shoe.cutCard == cuts[i]
+        shoe.shuffle()
+
+
+def test_partitions_deal_different_shoes(path):
+    orders = [
+            [card.index for card in ReplayShoe(path, start=i).cards]
+            for i in range(100)
+    ]
+    dealt = []
+    for index in range(3):
+        shoe = ReplayShoe(path, start=10)
+        shoe.partition(index, 3)
+        for i in range(5):
+            assert [card.index for card in shoe.cards] == (
+                    orders[11 + index + 3*i])
+            dealt.append(shoe.next)
+            shoe.shuffle()
+    assert len(set(dealt)) == 15
+
+
+def test_parallel_chunks_replay_different_shoes(make_game, path):
+    game = make_game(players=2, seed=7)
+    game.shoe = ReplayShoe(path)
+    chunks = [
+            _run_chunk(copy.deepcopy(game), 500, 1, None, i, 3)[0]
+            for i in range(3)
+    ]
+    assert chunks[0] != chunks[1] != chunks[2] != chunks[0]
+    again = _run_chunk(copy.deepcopy(game), 500, 2, None, 1, 3)[0]
+    assert again == chunks[1]
+
+
+def test_bad_file_is_unmapped(tmp_path):
+    bad = tmp_path / 'bad.bin'
+    bad.write_bytes(b'not a shoe file at all')
+    with pytest.raises(ValueError):
+        ShoeFile(str(bad))
+    bad.write_bytes(b'')
+    with pytest.raises(ValueError):
+        ShoeFile(str(bad))
+
+
+def test_close_with_live_views(path):
+    shoes = ShoeFile(path)
+    view = shoes.order(0)
+    cuts, orders = shoes.as_arrays()
+    with pytest.raises(BufferError):
+        shoes.close()
+    assert shoes.order(1).tolist() == orders[1].tolist()
+    del view, cuts, orders
+    shoes.close()
@@ -0,0 +1,48 @@
+import pytest
+
+from conftest import state
+from simulator import Simulator
+
+
+@pytest.mark.parametrize('decks, players, seeds', [
+        (1, 7, range(60)),
+        (1, 3, range(10)),
+        (2, 7, range(10)),
+        (6, 4, range(5)),
+])
+def test_fast_matches_classic(make_game, decks, players, seeds):
+    for seed in seeds:
+        fast = make_game(decks, players, seed)
+        classic = make_game(decks, players, seed)
+        Simulator(fast).run(2000)
+        classic.play_rounds(2000)
+        assert state(fast) == state(classic), seed
+
+
+def test_records_match_banks(make_game):
+    game = make_game(players=2)
+    for record in Simulator(game).iter_rounds(500):
+        assert record.bank == game.players[record.player].bank
+
+
+@pytest.mark.parametrize('kwargs', [
+        {'engine': 'classic'},
+        {'workers': 1},
+        {'precision': 0.0, 'timeBudget': 60.0},
+])
+def test_simulate_rounds_engines_agree(make_game, capsys, kwargs):
+    fast = make_game(players=3)
+    other = make_game(players=3)
+    fast.simulate_rounds(3000)
+    other.simulate_rounds(3000, **kwargs)
+    assert state(fast) == state(other)
+
+
+def test_stopping_early_leaves_shoe_ready(make_game):
+    stopped = make_game(players=3)
+    whole = make_game(players=3)
+    #Take only the first record of each round and drop the generator.
+    for i in range(500):
+        next(Simulator(stopped).iter_rounds(10**9))
+    Simulator(whole).run(500)
+    assert state(stopped) == state(whole)
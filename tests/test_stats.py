@@ -0,0 +1,61 @@
+import random
+import statistics
+
+import pytest
+
+from stats import CHECK_ROUNDS, RunningStats, run_until
+
+
+def values(seed, count=1000):
+    rng = random.Random(seed)
+    return [rng.choice((-10.0, 10.0, 0.0, 15.0, -20.0)) for i in range(count)]
+
+
+def running(xs):
+    stats = RunningStats()
+    for x in xs:
+        stats.add(x)
+    return stats
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_matches_statistics_module(seed):
+    xs = values(seed)
+    stats = running(xs)
+    assert stats.count == len(xs)
+    assert stats.mean == pytest.approx(statistics.fmean(xs))
+    assert stats.variance == pytest.approx(statistics.variance(xs))
+
+
+@pytest.mark.parametrize('cut', [0, 1, 2, 500, 999, 1000])
+def test_merge_matches_whole(cut):
+    xs = values(1)
+    whole, merged = running(xs), running(xs[:cut])
+    merged.merge(running(xs[cut:]))
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+
+
+def test_interval_needs_two_values():
+    stats = running([5.0])
+    assert stats.variance == 0.0
+    assert stats.interval() == float('inf')
+    with pytest.raises(KeyError):
+        running([1.0, 2.0]).interval(0.5)
+
+
+@pytest.mark.parametrize('engine', ['fast', 'classic'])
+def test_run_until_stops_on_precision(make_game, engine):
+    game = make_game(players=2)
+    stats, rounds = run_until(game, 10**6, precision=2.0, engine=engine)
+    assert rounds % CHECK_ROUNDS == 0 and rounds < 10**6
+    assert all(s.interval() <= 2.0 and s.count == rounds for s in stats)
+    total = sum(s.mean * s.count for s in stats)
+    assert total == pytest.approx(
+            sum(player.winnings for player in game.players))
+
+
+def test_run_until_stops_at_max_rounds(make_game):
+    stats, rounds = run_until(make_game(), 2500)
+    assert rounds == 2500 and stats[0].count == 2500
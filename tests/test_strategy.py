@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from conftest import state
+from simulator import Simulator
+from strategy import CountStrategy, Strategy
+
+RAMP = {0: 1, 1: 2, 2: 4, 3: 8}
+
+
+def count_game(make_game, seed=1):
+    game = make_game(players=0, seed=seed)
+    game.add_player(bank=10**6, strat=CountStrategy(RAMP, 8))
+    game.add_player(bank=10**6)
+    return game
+
+
+def test_count_bet_follows_count_after_push(make_game):
+    game = count_game(make_game)
+    player = game.players[0]
+    changed = 0
+    pushed = False
+    for i in range(3000):
+        expected = min(game.minBet * player.strat.bet(), player.bank)
+        if pushed and expected != player.bet:
+            changed += 1
+        bank = player.bank
+        game.deal_round()
+        assert player.bet == expected
+        for p in game.players:
+            game.play_hand(p)
+        game.play_dealer()
+        game.calculate_winners()
+        game.discard_hands()
+        if game.shoe.shuffleFlag:
+            game.shoe.shuffle()
+        pushed = player.bank == bank
+    assert changed
+
+
+def test_count_strategy_engines_agree(make_game):
+    for seed in range(5):
+        fast = count_game(make_game, seed)
+        classic = count_game(make_game, seed)
+        Simulator(fast).run(3000)
+        classic.play_rounds(3000)
+        assert state(fast) == state(classic)
+
+
+@pytest.mark.parametrize('args', [
+        (1, 0, 1, 0, 1000),
+        (2, 1, 1, 0, 500),
+        (1, '*2', 1, 0, 64),
+        (1, 0, 1, '*2', 100),
+        (3, 2, 1, '*3', 300),
+        (1, -1, 2, 1, 50),
+])
+def test_compiled_bets_match_iterators(args):
+    compiled, iterated = Strategy(*args), Strategy(*args)
+    iterated.winBets = iterated.loseBets = None
+    rng = random.Random(1)
+    for i in range(3000):
+        if rng.random() < 0.48:
+            assert compiled.win() == iterated.win()
+        else:
+            assert compiled.lose() == iterated.lose()
+    assert (compiled.maxWins, compiled.maxLoses) == (
+            iterated.maxWins, iterated.maxLoses)
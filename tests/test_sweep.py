@@ -0,0 +1,26 @@
+import pytest
+
+from simulator import Simulator
+from strategy import Strategy
+from sweep import make_grid, record_units, replay, sweep
+
+
+@pytest.mark.parametrize('args', [(1, 0, 1, 0, 100), (2, 1, 1, 0, 50),
+        (1, 0, 1, '*2', 64)])
+def test_replay_matches_game(make_game, args):
+    units = record_units(3000, seed=4)
+    game = make_game(players=0, seed=4)
+    game.add_player(bank=10**6, strat=Strategy(*args))
+    Simulator(game).run(3000)
+    player = game.players[0]
+    replayed = replay(units, Strategy(*args), bank=10**6)
+    assert (replayed.bank, replayed.maxWinnings, replayed.minWinnings) == (
+            player.bank, player.maxWinnings, player.minWinnings)
+
+
+def test_sweep_ranks_by_winnings():
+    results = sweep(make_grid([1, 2], [0, 1], [1], [0], [100]), 2000,
+            streams=2)
+    assert len(results) == 4
+    winnings = [result.winnings for result in results]
+    assert winnings == sorted(winnings, reverse=True)
@@ -0,0 +1,195 @@
+import copy
+import random
+
+import pytest
+
+from conftest import state
+from parallel import simulate_parallel
+from strategy import Strategy
+from tracking import (Drawdown, QuantileSketch, RoundTracker,
+        StreakHistogram, track_rounds)
+
+
+def results(seed, count):
+    rng = random.Random(seed)
+    return [rng.random() < 0.45 for i in range(count)]
+
+
+def streaks(outcomes):
+    """Return every streak in a list of results, the last one included."""
+    found = []
+    for won in outcomes:
+        if found and found[-1][0] == won:
+            found[-1][1] += 1
+        else:
+            found.append([won, 1])
+    return found
+
+
+def histogram(outcomes, maxLength=8):
+    """Count a run of results the way a tracked Strategy does."""
+    streaks = StreakHistogram(maxLength)
+    won, length = False, 0
+    for result in outcomes:
+        if length and result != won:
+            streaks.add(won, length)
+            length = 0
+        won = result
+        length += 1
+    streaks.finish(won, length)
+    return streaks
+
+
+def counts(streaks):
+    return streaks.wins, streaks.loses
+
+
+def test_histogram_counts_open_streak():
+    outcomes = results(1, 500)
+    expected = StreakHistogram(8)
+    for won, length in streaks(outcomes):
+        expected._count(won, length)
+    assert counts(histogram(outcomes)) == counts(expected)
+
+
+def test_finish_again_replaces_open_streak():
+    streaks = StreakHistogram()
+    streaks.add(True, 2)
+    streaks.finish(False, 1)
+    streaks.finish(False, 3)
+    assert streaks.loses[1] == 0 and streaks.loses[3] == 1
+    streaks.add(False, 4)
+    assert streaks.loses[3] == 0 and streaks.loses[4] == 1
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_merge_at_every_cut_matches_whole(seed):
+    outcomes = results(seed, 60)
+    whole = counts(histogram(outcomes))
+    for cut in range(len(outcomes) + 1):
+        merged = histogram(outcomes[:cut])
+        merged.merge(histogram(outcomes[cut:]))
+        assert counts(merged) == whole, cut
+
+
+def test_merge_of_many_chunks_matches_whole():
+    outcomes = [True] * 5 + [False] + [True] * 12 + [False] * 3
+    whole = counts(histogram(outcomes, 64))
+    cuts = [0, 2, 2, 5, 6, 9, 14, 18, 19, 21]
+    merged = StreakHistogram(64)
+    for start, end in zip(cuts, cuts[1:]):
+        merged.merge(histogram(outcomes[start:end], 64))
+    assert counts(merged) == whole
+    assert merged.wins[12] == 1 and merged.loses[3] == 1
+
+
+def test_merge_rejects_other_sizes():
+    with pytest.raises(ValueError):
+        StreakHistogram(8).merge(StreakHistogram(16))
+
+
+def test_sketch_merge_matches_whole():
+    rng = random.Random(1)
+    values = [rng.gauss(0, 500) for i in range(5000)] + [0.0] * 50
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, x in enumerate(values):
+        whole.add(x)
+        (first if i % 3 else second).add(x)
+    first.merge(second)
+    for q in (0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0):
+        assert first.quantile(q) == whole.quantile(q)
+    values.sort()
+    median = values[(len(values) - 1) // 2]
+    assert abs(whole.quantile(0.5) - median) <= 0.01 * abs(median)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_drawdown_merge_matches_whole(seed):
+    rng = random.Random(seed)
+    values = [100.0]
+    for i in range(300):
+        values.append(values[-1] + rng.choice((-10, 10, 20, -20)))
+    whole = Drawdown(values[0])
+    for value in values[1:]:
+        whole.update(value)
+    for cut in range(1, len(values)):
+        first, second = Drawdown(values[0]), Drawdown(values[cut - 1] + 50)
+        for value in values[1:cut]:
+            first.update(value)
+        for value in values[cut:]:
+            second.update(value + 50)
+        first.merge(second)
+        assert first.maxDrawdown == whole.maxDrawdown
+        assert (first.last, first.peak, first.low, first.rounds) == (
+                whole.last, whole.peak, whole.low, whole.rounds)
+        assert first.maxUnderwater <= whole.maxUnderwater
+
+
+@pytest.mark.parametrize('engine', ['fast', 'classic'])
+def test_track_rounds_counts_every_result(make_game, engine):
+    game = make_game(seed=3)
+    trackers = [RoundTracker(game.players[0], maxStreak=1000)]
+    track_rounds(game, 2000, trackers, engine)
+    strat, streaks = game.players[0].strat, trackers[0].streaks
+    assert sum(k*n for k, n in enumerate(streaks.wins)) == strat.winTotal
+    assert sum(k*n for k, n in enumerate(streaks.loses)) == strat.loseTotal
+    assert trackers[0].drawdown.rounds == 2000
+
+
+def test_parallel_trackers(make_game):
+    game = make_game(players=0, seed=2)
+    game.add_player(bank=1000)
+    game.add_player(bank=500, strat=Strategy(2, 1, 1, 0, 500))
+    untracked = copy.deepcopy(game)
+    trackers = [
+            RoundTracker(player, maxStreak=1000) for player in game.players
+    ]
+    simulate_parallel(game, 3000, workers=2, seed=1, chunks=3,
+            trackers=trackers)
+    simulate_parallel(untracked, 3000, workers=2, seed=1, chunks=3)
+    assert state(game) == state(untracked)
+    for player, tracker in zip(game.players, trackers):
+        strat, streaks = player.strat, tracker.streaks
+        assert sum(k*n for k, n in enumerate(streaks.wins)) == strat.winTotal
+        assert (sum(k*n for k, n in enumerate(streaks.loses)) ==
+                strat.loseTotal)
+        assert tracker.bankroll.count == tracker.drawdown.rounds == 3000
+        assert tracker.drawdown.last == player.winnings
+
+
+def test_track_rounds_restores_streak_hook(make_game):
+    game = make_game(seed=4)
+    strat = game.players[0].strat
+    assert strat.streaks is None
+    trackers = track_rounds(game, 200)
+    assert strat.streaks is None
+    outer = StreakHistogram()
+    strat.streaks = outer
+    track_rounds(game, 200, trackers)
+    assert strat.streaks is outer
+    inner = RoundTracker(game.players[0])
+    inner.close()
+    assert strat.streaks is outer
+
+
+def test_track_rounds_restores_hook_when_round_raises(make_game):
+    game = make_game(seed=4)
+    strat = game.players[0].strat
+
+    def fail(rounds):
+        raise RuntimeError('round failed')
+
+    game.play_rounds = fail
+    with pytest.raises(RuntimeError):
+        track_rounds(game, 10, engine='classic')
+    assert strat.streaks is None
+
+
+def test_reused_tracker_counts_every_round(make_game):
+    game = make_game(seed=5)
+    trackers = [RoundTracker(game.players[0], maxStreak=1000)]
+    track_rounds(game, 1000, trackers)
+    track_rounds(game, 1000, trackers)
+    strat, streaks = game.players[0].strat, trackers[0].streaks
+    assert sum(k*n for k, n in enumerate(streaks.wins)) == strat.winTotal
+    assert sum(k*n for k, n in enumerate(streaks.loses)) == strat.loseTotal
@@ -0,0 +1,469 @@
+"""Fixed-memory statistics updated every round and mergeable across workers.
+
+Player.get_stats only reports extremes. A RoundTracker follows one Player
+through a run and keeps:
+    the full histogram of win and lose streak lengths, reported by the
+    Player's Strategy as each streak ends (StreakHistogram),
+    the distribution of the Player's winnings over every round, for any
+    percentile (QuantileSketch),
+    the largest drawdown from a high and the time spent below it
+    (Drawdown).
+
+None of them grow with the number of rounds. Trackers from separate
+workers, each following one chunk of rounds, are combined with merge in
+chunk order, which parallel.simulate_parallel does when given trackers.
+
+QuantileSketch is a DDSketch: values are counted in logarithmically sized
+buckets, so every quantile is within a relative accuracy of the true value
+and two sketches merge exactly by adding their counts. P² estimators cannot
+be merged and t-digests merge only approximately.
+"""
+import math
+
+from simulator import Simulator, uses_chart
+
+#Values closer to zero than this are counted as zero by QuantileSketch.
+MIN_VALUE = 1e-9
+
+
+class StreakHistogram:
+    """This class counts win and lose streaks by length.
+
+    wins[k] and loses[k] are the number of streaks of length k. Streaks of
+    maxLength or more are counted together in the last position.
+
+    A Strategy only reports a streak once it ends, so the streak still open
+    at the end of a run is counted by finish. The first streak added and
+    the one counted by finish are remembered as leading and trailing, so
+    merge can join a trailing streak to the next histogram's leading one
+    when they are both wins or both losses.
+    """
+
+    def __init__(self, maxLength: int = 64) -> None:
+        self.maxLength = maxLength
+        self.wins = [0] * (maxLength + 1)
+        self.loses = [0] * (maxLength + 1)
+        #(won, length) of the first streak added and of the open streak
+        #counted by finish, or None.
+        self.leading = None
+        self.trailing = None
+
+    def _count(self, won: bool, length: int, amount: int = 1) -> None:
+        """Add amount to the count of streaks like this one."""
+        counts = self.wins if won else self.loses
+        counts[min(length, self.maxLength)] += amount
+
+    def add(self, won: bool, length: int) -> None:
+        """Count one streak.
+
+        A streak added after finish is the open streak ending, so the
+        open streak is no longer counted on its own.
+
+        Keyword arguments:
+        won     --  True for a win streak, False for a lose streak.
+        length  --  The number of results in the streak.
+        """
+        if self.trailing is not None:
+            self._count(*self.trailing, -1)
+            self.trailing = None
+        if self.leading is None:
+            self.leading = (won, length)
+        self._count(won, length)
+
+    def finish(self, won: bool, length: int) -> None:
+        """Count the streak still open at the end of a run.
+
+        It replaces any open streak counted by an earlier finish.
+
+        Keyword arguments:
+        won     --  True for a win streak, False for a lose streak.
+        length  --  The number of results in the streak so far. Nothing is
+                    counted if this is 0.
+        """
+        if self.trailing is not None:
+            self._count(*self.trailing, -1)
+            self.trailing = None
+        if length:
+            self._count(won, length)
+            self.trailing = (won, length)
+
+    def merge(self, other: 'StreakHistogram') -> None:
+        """Add the counts of a StreakHistogram of the same size that
+        counted the streaks right after these.
+
+        If this one's open streak and the other's first streak are both
+        wins or both losses they are one streak, and are counted once with
+        their lengths added.
+        """
+        if other.maxLength != self.maxLength:
+            raise ValueError('Cannot merge histograms of different sizes.')
+        if other.leading is None and other.trailing is None:
+            return
+        for i in range(self.maxLength + 1):
+            self.wins[i] += other.wins[i]
+            self.loses[i] += other.loses[i]
+        leading, trailing = self.leading, other.trailing
+        first = other.leading if other.leading is not None else trailing
+        if self.trailing is not None and self.trailing[0] == first[0]:
+            joined = (first[0], self.trailing[1] + first[1])
+            self._count(*self.trailing, -1)
+            self._count(*first, -1)
+            self._count(*joined)
+            if other.leading is None:
+                #The other histogram only saw the open streak go on.
+                trailing = joined
+            elif leading is None:
+                leading = joined
+        elif leading is None:
+            #This histogram's open streak, if any, ended before the other's.
+            if self.trailing is not None:
+                leading = self.trailing
+            else:
+                leading = other.leading
+        self.leading, self.trailing = leading, trailing
+
+    def __str__(self) -> str:
+        lines = [f'{"Length":<8}{"Wins":>10}{"Loses":>10}']
+        for k in range(1, self.maxLength + 1):
+            if self.wins[k] or self.loses[k]:
+                label = f'{k}+' if k == self.maxLength else str(k)
+                lines.append(f'{label:<8}{self.wins[k]:>10}{self.loses[k]:>10}')
+        return '\n'.join(lines)
+
+
+class QuantileSketch:
+    """This class estimates quantiles of a stream of numbers in fixed
+    memory.
+    """
+
+    def __init__(
+            self, accuracy: float = 0.01, maxBuckets: int = 2048
+    ) -> None:
+        """Create an empty sketch.
+
+        Keyword arguments:
+        accuracy    --  The relative accuracy of every quantile.
+                        (0.01 default)
+        maxBuckets  --  The most buckets kept for each sign. Past this the
+                        buckets closest to zero are combined, which only
+                        loses accuracy for the smallest values.
+                        (2048 default)
+        """
+        self.accuracy = accuracy
+        self.maxBuckets = maxBuckets
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.logGamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float) -> None:
+        """Add one number to the sketch."""
+        self.count += 1
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if x > MIN_VALUE:
+            store = self.positive
+        elif x < -MIN_VALUE:
+            store, x = self.negative, -x
+        else:
+            self.zero += 1
+            return
+        key = math.ceil(math.log(x) / self.logGamma)
+        store[key] = store.get(key, 0) + 1
+        if len(store) > self.maxBuckets:
+            self._collapse(store)
+
+    def _collapse(self, store: dict) -> None:
+        """Combine the buckets closest to zero until few enough are left."""
+        keys = sorted(store)
+        extra = len(keys) - self.maxBuckets
+        for key in keys[:extra]:
+            store[keys[extra]] += store.pop(key)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Add every number counted by another sketch of the same
+        accuracy.
+        """
+        if other.accuracy != self.accuracy:
+            raise ValueError('Cannot merge sketches of different accuracy.')
+        for store, otherStore in (
+                (self.positive, other.positive),
+                (self.negative, other.negative)
+        ):
+            for key, count in otherStore.items():
+                store[key] = store.get(key, 0) + count
+            if len(store) > self.maxBuckets:
+                self._collapse(store)
+        self.zero += other.zero
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Return an estimate of the q quantile, with q from 0 to 1.
+
+        Raises a ValueError if the sketch is empty.
+        """
+        if not self.count:
+            raise ValueError('Cannot take a quantile of an empty sketch.')
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-self._value(key), self.min)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self._value(key), self.max)
+        return self.max
+
+    def _value(self, key: int) -> float:
+        """Return the value that represents a bucket."""
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+
+class Drawdown:
+    """This class tracks the largest fall from a high in a stream of values
+    and how long the values stay below their high.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        """Start tracking from a value, which counts as the first high.
+
+        The value a Player's winnings are followed from is their winnings
+        when the tracking starts.
+        """
+        self.start = self.last = self.peak = self.low = start
+        self.maxDrawdown = 0.0
+        self.rounds = 0
+        #The current, longest, total and first runs of rounds spent below
+        #the high.
+        self.underwater = 0
+        self.maxUnderwater = 0
+        self.totalUnderwater = 0
+        self.leading = 0
+
+    @property
+    def leadingUnderwater(self) -> int:
+        """The number of rounds before the values first got back to start."""
+        if self.underwater == self.rounds:
+            return self.underwater
+        return self.leading
+
+    def update(self, value: float) -> None:
+        """Add the value after one more round."""
+        self.rounds += 1
+        self.last = value
+        if value >= self.peak:
+            if self.underwater == self.rounds - 1:
+                self.leading = self.underwater
+            self.peak = value
+            self.underwater = 0
+        else:
+            self.underwater += 1
+            self.totalUnderwater += 1
+            if self.underwater > self.maxUnderwater:
+                self.maxUnderwater = self.underwater
+            if self.peak - value > self.maxDrawdown:
+                self.maxDrawdown = self.peak - value
+        if value < self.low:
+            self.low = value
+
+    def merge(self, other: 'Drawdown') -> None:
+        """Add the values of another Drawdown as if they came after these.
+
+        The other values are shifted to carry on from this one's last
+        value. The drawdown is exact. If this one ends below its high and
+        the other climbs back above it, the rounds until the other first
+        reaches its own start are counted as underwater, but any rounds
+        after that spent between its start and this high are not, so the
+        time underwater may be slightly low.
+        """
+        if not other.rounds:
+            return
+        offset = self.last - other.start
+        deficit = self.peak - self.last
+        wasLeading = self.underwater == self.rounds
+        self.maxDrawdown = max(self.maxDrawdown, other.maxDrawdown,
+                deficit + other.start - other.low)
+        if deficit > 0 and other.peak + offset < self.peak:
+            #The other values never get back to this high.
+            self.underwater += other.rounds
+            self.totalUnderwater += other.rounds
+            self.maxUnderwater = max(self.maxUnderwater, self.underwater)
+        else:
+            run = self.underwater + other.leadingUnderwater
+            self.maxUnderwater = max(self.maxUnderwater,
+                    other.maxUnderwater, run)
+            self.totalUnderwater += other.totalUnderwater
+            if wasLeading:
+                self.leading = run
+            self.underwater = other.underwater
+        self.peak = max(self.peak, other.peak + offset)
+        self.low = min(self.low, other.low + offset)
+        self.last = other.last + offset
+        self.rounds += other.rounds
+
+
+class RoundTracker:
+    """This class keeps fixed-memory statistics of a Player's run."""
+
+    def __init__(
+            self, player, accuracy: float = 0.01, maxStreak: int = 64
+    ) -> None:
+        """Start tracking a Player from their current winnings.
+
+        The Player's Strategy reports each ended streak to this tracker's
+        StreakHistogram until the tracker is closed.
+
+        Keyword arguments:
+        player      --  The Player to track.
+        accuracy    --  The relative accuracy of the winnings percentiles.
+                        (0.01 default)
+        maxStreak   --  Streaks this long or longer are counted together.
+                        (64 default)
+        """
+        self.player = player
+        self.bankroll = QuantileSketch(accuracy)
+        self.drawdown = Drawdown(player.winnings)
+        self.streaks = StreakHistogram(maxStreak)
+        self.previous = None
+        self.attach()
+
+    def attach(self) -> None:
+        """Have the Player's Strategy report its streaks to this tracker.
+
+        The Strategy's previous StreakHistogram, if any, is kept so close
+        can put it back. Attaching an attached tracker does nothing.
+        """
+        strat = self.player.strat
+        if strat.streaks is not self.streaks:
+            self.previous = strat.streaks
+            strat.streaks = self.streaks
+
+    def close(self) -> None:
+        """Give the Player's Strategy back the StreakHistogram it reported
+        to before this tracker was attached.
+
+        track_rounds closes its trackers when it returns or raises. Closing
+        a tracker that is not attached does nothing.
+        """
+        strat = self.player.strat
+        if strat.streaks is self.streaks:
+            strat.streaks = self.previous
+
+    def update(self) -> None:
+        """Record the Player's winnings after a round."""
+        winnings = self.player.winnings
+        self.bankroll.add(winnings)
+        self.drawdown.update(winnings)
+
+    def finish(self) -> None:
+        """Count the Player's open win or lose streak.
+
+        track_rounds does this after its last round. It can be done again
+        after more rounds, replacing the open streak counted before.
+        """
+        strat = self.player.strat
+        if strat.winStreak:
+            self.streaks.finish(True, strat.winStreak)
+        else:
+            self.streaks.finish(False, strat.loseStreak)
+
+    def merge(self, other: 'RoundTracker') -> None:
+        """Add the statistics of a tracker that followed the next chunk of
+        rounds.
+
+        Both trackers should be finished, so a streak running from the end
+        of one chunk into the next is counted as one streak.
+        """
+        self.bankroll.merge(other.bankroll)
+        self.drawdown.merge(other.drawdown)
+        self.streaks.merge(other.streaks)
+
+    def percentiles(
+            self, qs: tuple = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+    ) -> dict[float, float]:
+        """Return the Player's winnings at each quantile in qs."""
+        return {q: self.bankroll.quantile(q) for q in qs}
+
+    def __str__(self) -> str:
+        drawdown = self.drawdown
+        lines = [f'{self.player.name} over {drawdown.rounds} rounds']
+        if drawdown.rounds:
+            lines.append('Winnings percentiles: ' + ', '.join(
+                    f'{q:.0%}: {v:.0f}' for q, v in self.percentiles().items()
+            ))
+        lines.append(f'Max drawdown: {drawdown.maxDrawdown:.2f}')
+        lines.append(f'Longest time underwater: {drawdown.maxUnderwater} '
+                f'rounds, total: {drawdown.totalUnderwater} rounds')
+        lines.append(str(self.streaks))
+        return '\n'.join(lines)
+
+
+def track_rounds(
+        game, rounds: int, trackers: list[RoundTracker] | None = None,
+        engine: str = 'fast'
+) -> list[RoundTracker]:
+    """Play rounds, updating a RoundTracker for each Player every round.
+
+    Returns the trackers, which are created if none are given, finished so
+    the streak each Player is on at the end is counted. The trackers are
+    attached for the rounds and closed afterwards, even if a round raises,
+    so each Strategy is left reporting to what it reported to before. Use
+    parallel.simulate_parallel to track rounds across several processes.
+
+    Keyword arguments:
+    game        --  The Blackjack game to simulate.
+    rounds      --  The number of rounds to play.
+    trackers    --  A RoundTracker for each Player in game.players, in the
+                    same order. (None default)
+    engine      --  'fast' plays with a Simulator unless the game is
+                    displaying hands or a Player has a provider, 'classic'
+                    with Blackjack.play_rounds. ('fast' default)
+    """
+    if trackers is None:
+        trackers = [RoundTracker(player) for player in game.players]
+    try:
+        for tracker in trackers:
+            tracker.attach()
+        if engine == 'fast' and not game.display and uses_chart(game):
+            for record in Simulator(game).iter_rounds(rounds):
+                trackers[record.player].update()
+        else:
+            for i in range(rounds):
+                game.play_rounds(1)
+                for tracker in trackers:
+                    tracker.update()
+    finally:
+        for tracker in trackers:
+            tracker.finish()
+            tracker.close()
+    return trackers
+
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+    import time
+    from blackjack import Blackjack
+    from strategy import Strategy
+    with contextlib.redirect_stdout(io.StringIO()):
+        myGame = Blackjack(6, 0, seed=1)
+        myGame.add_player(strat=Strategy(2, 1, 1, 0, 500), bank=1000)
+    myGame.display = False
+    start = time.perf_counter()
+    myTrackers = track_rounds(myGame, 200000)
+    elapsed = time.perf_counter() - start
+    print(f'Tracked 200000 rounds in {elapsed:.2f}s\n')
+    print(myTrackers[0])